@@ -1,20 +1,77 @@
+import collections
+import copyreg
 import datetime 
+import gzip
+import hashlib
+import io
 import json
+import multiprocessing
+import os
+import re
 import string
+import threading
+import time
+import types
 import psycopg2
+import psycopg2.extras
+import queue
 import random
+import numpy as np
+import shapely
 import tkinter as tk
-from random import randint
-from random import randrange
 from shapely.geometry import Polygon, Point, shape, GeometryCollection
 from configparser import ConfigParser
 from tkinter import filedialog
 
+# zstandard is only needed to write .zst SQL files.
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# pyarrow is only needed to write GeoParquet files.
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# States of the cells in the grid sampler's index.
+GRID_EXTERIOR = 0
+GRID_INTERIOR = 1
+GRID_BOUNDARY = 2
+
+# Increment and multipliers of the splitmix64 hash used by the counter based random generator.
+SPLITMIX_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+SPLITMIX_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+SPLITMIX_MUL2 = np.uint64(0x94D049BB133111EB)
+
+# Streams of the counter based random generator, one for each kind of number drawn for a row.
+STREAM_POINT = 1
+STREAM_FEATURE = 2
+STREAM_TRIANGLE = 3
+STREAM_COLUMN = 4
+STREAM_NULL = 5
+
+# Types a column can have in the [columns] section and the PostgreSQL type each one is created with.
+COLUMN_TYPES = {'text': 'TEXT', 'int': 'INT', 'float': 'DOUBLE PRECISION', 'timestamp': 'TIMESTAMP'}
+# Characters random text columns are made from.
+TEXT_ALPHABET = string.ascii_letters + string.digits
+
+# Version of the cache files, change it whenever what is stored in them changes.
+CACHE_VERSION = 1
+# Arrays of each sampler that are worth keeping in the cache.
+SAMPLER_CACHE_KEYS = {'triangulate': ('corners', 'cumulativeArea'), 'grid': ('cells', 'cellSize')}
+
+# Settings of one run, read once from the .ini file by loadRunConfig and passed to every stage.
+# Every section is a read-only mapping so no stage can change the settings partway through a run.
+RunConfig = collections.namedtuple('RunConfig', ['fileName', 'database', 'numPoints', 'geojson', 'tableName', 'sqlFile', 'cache', 'sampling', 'generation', 'columns', 'load', 'output', 'parquet'])
+
 # Function used to create a root window to allow user to select a .ini file.
 def filePicker():
 
     # Lets User know what file is necessary
-    print("Please select a .ini file with sections: [postgresql], [numPoints], [geojson], [TableName], [SQLFile], [addColumn] and [colVals].")
+    print("Please select a .ini file with sections: [postgresql], [numPoints], [geojson], [TableName], [SQLFile] and either [columns] or [addColumn] and [colVals]. [load] method=copy streams rows with COPY. [ParquetFile] is only needed to write a GeoParquet file.")
 
     # To initialize tkinter, I created a Tk root widget, which is a window with a title bar and other decoration provided by the window manager.
     # The root widget has to be created before any other widgets and there can only be one root widget.
@@ -27,7 +84,7 @@ def filePicker():
     fileName = filedialog.askopenfilename()
     
     # Asks the user which service they would like from the program.
-    check = input("Would you like to connect to the database (A) or print to an SQL file (B)? (A/B): ")
+    check = input("Would you like to connect to the database (A), print to an SQL file (B) or write a GeoParquet file (C)? (A/B/C): ")
     # Checks A or B
     if check == "A" or check == "a":
         # Sends the fileName to the database connection program.
@@ -36,6 +93,10 @@ def filePicker():
     elif check == "B" or check == "b":
         # Sends the fileName to the SQL file print program.
         createSql(fileName)
+
+    elif check == "C" or check == "c":
+        # Sends the fileName to the GeoParquet file program.
+        createParquet(fileName)
     else:
         print("Invalid Entry")
         exit()
@@ -43,16 +104,19 @@ def filePicker():
 # Commits the points to the databse if requested by the user.
 def toDatabase(fileName):
 
-    # Acquire number of rows from file.
-    NUMBER_ROWS = getNumPoints(fileName)
+    # Read and check the whole .ini file before connecting to the database.
+    run = loadRunConfig(fileName, 'database')
+    # Acquire number of rows in the run's range of rows, the name of the table and the columns to fill from the run.
+    startRow, endRow = rowRange(run.numPoints, run.generation)
+    NUMBER_ROWS = endRow - startRow
+    TABLE_NAME = run.tableName
+    columns = run.columns
     # Acquire polygon from file.
-    poly = getPolygon(fileName)
-    # Acquire the name of the table from file.
-    TABLE_NAME = getTableName(fileName)
-    # Use random_points_within function to generate all of the necessary points with the submitted polygon and number of points .
-    generated_points = random_points_within(poly, NUMBER_ROWS)
-    # Receive Database parameters from config file.
-    params = config(fileName)
+    poly = getPolygon(run)
+    # Use generatePoints function to generate the rows in blocks as they are written with the submitted polygon and number of points.
+    generated_points = generatePoints(poly, run)
+    # Receive Database parameters from the run.
+    params = run.database
 
     # Connect to database using config file parameters, throw exception and close if wrong credentials.
     try:
@@ -68,17 +132,19 @@ def toDatabase(fileName):
 
     # Ask the user questions about what functionality they would like.
     check = input("Would you like to create a new table? (Y/N): ")
+    # The fast profile only applies to a table created by this run.
+    fastLoad = False
 
     if check == "Y" or check == "y":
         # If "Y", create a table with the user's inputted table name 
+        # The fast profile creates the table UNLOGGED and leaves the index until the rows are loaded.
+        fastLoad = run.load['profile'] == 'fast'
         # Try to see the table doesn't exist
         try:
             # Create table if it doesn't exist
-            cur.execute(
-                "CREATE TABLE {} (pkid SERIAL PRIMARY KEY NOT NULL, randStr TEXT, randInt INT, randTime TIMESTAMP, thegeom GEOMETRY DEFAULT ST_GeomFromText('POINT(-6.7 54)',4326)); \n".format(TABLE_NAME))
+            cur.execute(createTableSql(TABLE_NAME, columns, fastLoad))
             # Commit to database.
             con.commit()
-            print("Table {} created. ".format(TABLE_NAME))
         
         # If the table exists throw exception.
         except Exception:
@@ -87,13 +153,16 @@ def toDatabase(fileName):
             # Drop the table if it exits before creating the table.
             cur.execute("DROP TABLE IF EXISTS {}".format(TABLE_NAME))
             # Create table with all possible columns.
-            cur.execute(
-                "CREATE TABLE {} (pkid SERIAL PRIMARY KEY NOT NULL, randStr TEXT, randInt INT, randTime TIMESTAMP, thegeom GEOMETRY DEFAULT ST_GeomFromText('POINT(-6.7 54)',4326)); \n".format(TABLE_NAME))
+            cur.execute(createTableSql(TABLE_NAME, columns, fastLoad))
+            # Commit all to database
+            con.commit()
+
+        if not fastLoad:
             # Create spatial index with table name in index name.
             cur.execute("CREATE INDEX {}_spatial_index ON {} USING gist (thegeom); \n".format(TABLE_NAME, TABLE_NAME))
-            # Commit all to database
+            # Commit to database.
             con.commit()
-            print("Table {} created. ".format(TABLE_NAME))
+        print("Table {} created. ".format(TABLE_NAME))
     
     # Asks the user if they'd like to clear the table if they're not creating a new one.
     elif check == "N" or check == "n":
@@ -121,53 +190,351 @@ def toDatabase(fileName):
     # Commit changes to the database.
     con.commit()  
 
-    # Use iterator function to execute insert statements to database
-    pointIterDb(generated_points, cur, con, TABLE_NAME, fileName)
+    # Use iterator function to load the rows into the database, timing how long the rows take to generate and load.
+    start = time.perf_counter()
+    if run.load['method'] == 'server':
+        serverIterDb(poly, cur, con, TABLE_NAME, columns, NUMBER_ROWS, run.generation)
+    elif run.load['connections'] > 1:
+        parallelIterDb(generated_points, cur, con, params, TABLE_NAME, columns, run.load, NUMBER_ROWS)
+    elif run.load['pipeline']:
+        pipelineIterDb(generated_points, cur, con, TABLE_NAME, columns, run.load)
+    else:
+        pointIterDb(generated_points, cur, con, TABLE_NAME, columns, run.load)
+    seconds = time.perf_counter() - start
     print("Successfully committed {} rows to table: {}.".format(NUMBER_ROWS, TABLE_NAME))
+    print("Loaded in {:.2f} seconds, {:.0f} rows/sec.".format(seconds, NUMBER_ROWS / max(seconds, 1e-9)))
+
+    # Compare the server load against generating the rows in Python and loading them with COPY.
+    if run.load['benchmark']:
+        benchmarkClientLoad(generated_points, cur, con, columns, NUMBER_ROWS, seconds)
+
+    # Build the index and make the table logged now that the rows are in.
+    if fastLoad:
+        finishFastLoad(cur, con, TABLE_NAME, run.load)
+
+# Runs the steps of the fast profile that come after the load, timing each one.
+def finishFastLoad(cur, con, TABLE_NAME, load):
+
+    # Build the spatial index once over all of the rows instead of updating it for every row.
+    phases = [("Built spatial index", "CREATE INDEX {}_spatial_index ON {} USING gist (thegeom)".format(TABLE_NAME, TABLE_NAME))]
+    # Order the rows on disk by the spatial index if asked for.
+    if load['cluster']:
+        phases.append(("Clustered table", "CLUSTER {} USING {}_spatial_index".format(TABLE_NAME, TABLE_NAME)))
+    # Gather statistics after the rows are in their final order.
+    phases.append(("Analyzed table", "ANALYZE {}".format(TABLE_NAME)))
+    # Write the table to the write ahead log so it survives a crash.
+    phases.append(("Set table logged", "ALTER TABLE {} SET LOGGED".format(TABLE_NAME)))
+
+    for name, statement in phases:
+        start = time.perf_counter()
+        try:
+            cur.execute(statement)
+            con.commit()
+        except Exception as error:
+            print("{} failed: {}\nClosed.".format(name, error))
+            exit()
+        print("{} in {:.2f} seconds.".format(name, time.perf_counter() - start))
 
 # Writes the points to an SQL file if requested by the user for manual commits.
 def createSql(fileName):
 
-    # Acquire number of rows from file.
-    NUMBER_ROWS = getNumPoints(fileName)
+    # Read and check the whole .ini file before generating anything.
+    run = loadRunConfig(fileName, 'sql')
+    # Acquire number of rows in the run's range of rows, the name of the table and the columns to fill from the run.
+    startRow, endRow = rowRange(run.numPoints, run.generation)
+    NUMBER_ROWS = endRow - startRow
+    TABLE_NAME = run.tableName
+    columns = run.columns
     # Acquire polygon from file.
-    poly = getPolygon(fileName)
-    # Use random_points_within function to generate all of the necessary points with the submitted polygon and number of points.
-    generated_points = random_points_within(poly, NUMBER_ROWS)
-    # Acquire the name of the table from file.
-    TABLE_NAME = getTableName(fileName)
-    try:
-        # Opens up the sql filename given in the .ini file and writes to it.
-        sqlFile = open(getSqlFile(fileName), "w")
+    poly = getPolygon(run)
+
+    # Write the schema, index and data files in shards if asked for.
+    if run.output['shards'] > 1:
+        createShardedSql(poly, run)
+        return
+
+    # Use generatePoints function to generate the rows in blocks as they are written with the submitted polygon and number of points.
+    generated_points = generatePoints(poly, run)
+    try:
+        # Opens up the sql filename given in the .ini file once, clearing it, and writes to it through one large buffer.
+        sqlFile = openSqlFile(run.sqlFile, run.output)
     except Exception:
         print("No SQL file name found.\nClosed.")
         exit()
 
-    # Writes nothing to clear file.
-    sqlFile.write("")
-    # Closes sql file.
-    sqlFile.close()
-
-    # Opens up the sql filename given in the .ini file and appends to it.
-    sqlFile = open(getSqlFile(fileName), "a")
+    # Time how long the rows take to generate and write.
+    start = time.perf_counter()
     # Write to the file a DROP statement in case the table exists.
     sqlFile.write("DROP TABLE IF EXISTS {}; \n".format(TABLE_NAME))
-    # Write CREATE statement to file to make table with optional columns.
-    sqlFile.write(
-        "CREATE TABLE {} (pkid SERIAL PRIMARY KEY NOT NULL, randStr TEXT, randInt INT, randTime TIMESTAMP, thegeom GEOMETRY DEFAULT ST_GeomFromText('POINT(-6.7 54)',4326)); \n".format(TABLE_NAME))
-    # Write a CREATE statement for a spatial index for the table.
-    sqlFile.write("CREATE INDEX {}_spatial_index ON {} USING gist (thegeom); \n".format(TABLE_NAME, TABLE_NAME))
-    # Use iterator function to iterate through all points and append them to the file.
-    pointIterSql(generated_points, sqlFile, TABLE_NAME, fileName)
-    print("Successfully printed {} rows to {} with table name: {}.".format(NUMBER_ROWS, getSqlFile(fileName), TABLE_NAME))
-
-# Config function takes in a .ini file and acquires the database connect information from it
-def config(fileName):
+    # Write CREATE statement to file to make table with the columns from the .ini file.
+    sqlFile.write(createTableSql(TABLE_NAME, columns))
+    indexSql = "CREATE INDEX {}_spatial_index ON {} USING gist (thegeom); \n".format(TABLE_NAME, TABLE_NAME)
+    if run.output['format'] == 'copy':
+        # Write every row in one COPY block, then build the spatial index once the rows are in.
+        copyIterSql(generated_points, sqlFile, TABLE_NAME, columns)
+        sqlFile.write(indexSql)
+    elif run.output['format'] == 'multi':
+        # Write a CREATE statement for a spatial index for the table, then the rows in multi-row INSERT statements.
+        sqlFile.write(indexSql)
+        multiIterSql(generated_points, sqlFile, TABLE_NAME, columns, run.output)
+    else:
+        # Write a CREATE statement for a spatial index for the table.
+        sqlFile.write(indexSql)
+        # Use iterator function to iterate through all points and append them to the file.
+        pointIterSql(generated_points, sqlFile, TABLE_NAME, columns)
+    # Close the file so the buffer is written out.
+    sqlFile.close()
+    seconds = time.perf_counter() - start
+    print("Successfully printed {} rows to {} with table name: {}.".format(NUMBER_ROWS, run.sqlFile, TABLE_NAME))
+
+    # Report the size of the file and how fast it was written.
+    megabytes = os.path.getsize(run.sqlFile) / (1024 * 1024)
+    print("Wrote {:.1f} MB{} in {:.2f} seconds, {:.1f} MB/sec, {:.0f} rows/sec.".format(
+        megabytes, "" if run.output['compression'] == 'none' else " of " + run.output['compression'], seconds, megabytes / max(seconds, 1e-9), NUMBER_ROWS / max(seconds, 1e-9)))
+
+# Writes a schema file, an index file and shards data files, each shard written by its own process, and a manifest listing them.
+def createShardedSql(poly, run):
+
+    TABLE_NAME = run.tableName
+    shards = run.output['shards']
+    paths = shardPaths(run.sqlFile, shards)
+
+    # Plan the blocks of every shard the same way as the blocks of every worker, so each shard is one range of about the same number of rows.
+    startRow, endRow = rowRange(run.numPoints, run.generation)
+    groups = planRanges(run.numPoints, dict(run.generation, workers=shards))
+    rowCounts = [sum(block[0] for block in group) for group in groups]
+    # Position of each shard's first row among the rows of the whole run, not its pkid, which the table only gives out as the shards load.
+    rowOffsets = [startRow + sum(rowCounts[:shard]) for shard in range(shards)]
+
+    # Load the slow to build parts of the sampler from the cache, or build and cache them, once for every shard.
+    prepStart = time.perf_counter()
+    cached = getCachedSamplerArrays(poly, run.sampling, run.cache)
+
+    # Report the speedup against the original sampler if asked for in the .ini file, with a sampler prepared here only for it.
+    if run.sampling['benchmark'] > 0:
+        sampler = prepareSampler(poly, run.sampling, cached)
+        benchmarkSampler(sampler, run.sampling['benchmark'], time.perf_counter() - prepStart)
+
+    # Write the schema first and the index last, so the shards load into a table without an index.
+    start = time.perf_counter()
+    schemaFile = openSqlFile(paths['schema'], run.output)
+    schemaFile.write("DROP TABLE IF EXISTS {}; \n".format(TABLE_NAME))
+    schemaFile.write(createTableSql(TABLE_NAME, run.columns))
+    schemaFile.close()
+    indexFile = openSqlFile(paths['index'], run.output)
+    indexFile.write("CREATE INDEX {}_spatial_index ON {} USING gist (thegeom); \n".format(TABLE_NAME, TABLE_NAME))
+    indexFile.write("ANALYZE {}; \n".format(TABLE_NAME))
+    indexFile.close()
+
+    # Every process prepares its own sampler from the cached arrays and writes one shard.
+    with multiprocessing.Pool(shards) as pool:
+        results = pool.starmap(writeShard, [(poly, run, cached, groups[shard], paths['data'][shard]) for shard in range(shards)])
+    seconds = time.perf_counter() - start
+    rows = [shardRows for shardRows, stats in results]
+
+    # Print the acceptance rates of every shard's sampler together.
+    total = None
+    for shardRows, stats in results:
+        total = addSamplerStats(total, stats)
+    printSamplerStats(total)
+
+    # List the files in the order they are loaded, the data files can be loaded by concurrent psql sessions.
+    manifest = {
+        'table': TABLE_NAME,
+        'rows': sum(rows),
+        'schema': paths['schema'],
+        'data': [{'file': paths['data'][shard], 'rowOffset': rowOffsets[shard], 'rows': rows[shard]} for shard in range(shards)],
+        'index': paths['index']}
+    with open(paths['manifest'], "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    megabytes = sum(os.path.getsize(path) for path in [paths['schema'], paths['index']] + paths['data']) / (1024 * 1024)
+    print("Successfully printed {} rows to {} shards with table name: {}, manifest: {}.".format(sum(rows), shards, TABLE_NAME, paths['manifest']))
+    print("Wrote {:.1f} MB in {:.2f} seconds, {:.1f} MB/sec, {:.0f} rows/sec.".format(
+        megabytes, seconds, megabytes / max(seconds, 1e-9), sum(rows) / max(seconds, 1e-9)))
+
+# Returns the paths of the schema, index, data and manifest files of a sharded SQL file, keeping its extensions.
+def shardPaths(path, shards):
+
+    # Keep the compression extension after the .sql extension.
+    compressionExtension = ""
+    for extension in (".gz", ".zst", ".zstd"):
+        if path.endswith(extension):
+            path, compressionExtension = path[:-len(extension)], extension
+    stem, extension = os.path.splitext(path)
+
+    paths = {}
+    paths['schema'] = "{}.schema{}{}".format(stem, extension, compressionExtension)
+    paths['index'] = "{}.index{}{}".format(stem, extension, compressionExtension)
+    paths['data'] = ["{}.part{:03d}{}{}".format(stem, shard, extension, compressionExtension) for shard in range(shards)]
+    paths['manifest'] = "{}.manifest.json".format(stem)
+    return paths
+
+# Generates the blocks of one shard in a worker process, writes them to the shard's file and returns the number of rows and the sampler's counts.
+def writeShard(poly, run, cached, blocks, path):
+
+    sampler = prepareSampler(poly, run.sampling, cached)
+    generated_points = (generateBlock(sampler, run.columns, block, run.generation['source']) for block in blocks)
+
+    sqlFile = openSqlFile(path, run.output)
+    if run.output['format'] == 'copy':
+        copyIterSql(generated_points, sqlFile, run.tableName, run.columns)
+    elif run.output['format'] == 'multi':
+        multiIterSql(generated_points, sqlFile, run.tableName, run.columns, run.output)
+    else:
+        pointIterSql(generated_points, sqlFile, run.tableName, run.columns)
+    sqlFile.close()
+    return sum(block[0] for block in blocks), samplerStats(sampler)
+
+# Writes the points and their columns to a GeoParquet file if requested by the user.
+def createParquet(fileName):
+
+    # Read and check the whole .ini file before generating anything.
+    run = loadRunConfig(fileName, 'parquet')
+    # Acquire number of rows in the run's range of rows.
+    startRow, endRow = rowRange(run.numPoints, run.generation)
+    NUMBER_ROWS = endRow - startRow
+    columns = run.columns
+    parquet = run.parquet
+    # Acquire polygon from file.
+    poly = getPolygon(run)
+    # Use generatePoints function to generate the rows in blocks as they are written with the submitted polygon and number of points.
+    generated_points = generatePoints(poly, run)
+
+    schema = parquetSchema(columns)
+    try:
+        writer = pyarrow.parquet.ParquetWriter(parquet['file'], schema,
+            compression=parquet['compression'], compression_level=parquet['compressionLevel'], use_dictionary=parquet['dictionary'])
+    except Exception:
+        print("Parquet file could not be opened.\nClosed.")
+        exit()
+
+    # Time how long the rows take to generate and write.
+    start = time.perf_counter()
+    # Only the blocks of the row group being filled are kept in memory.
+    rowGroupSize = parquet['rowGroupSize']
+    batches = []
+    waiting = 0
+    # Row i of the whole run has pkid i + 1, so a range of rows keeps the pkids it would have in the full file.
+    pkid = startRow + 1
+    for block in generated_points:
+        batches.append(parquetBatch(schema, columns, block, pkid))
+        waiting += len(block[0])
+        pkid += len(block[0])
+        if waiting < rowGroupSize:
+            continue
+        # Write every full row group and keep the rows left over for the next one.
+        table = pyarrow.Table.from_batches(batches, schema=schema)
+        while table.num_rows >= rowGroupSize:
+            writer.write_table(table.slice(0, rowGroupSize), row_group_size=rowGroupSize)
+            table = table.slice(rowGroupSize)
+        batches = table.to_batches()
+        waiting = table.num_rows
+    # Write the last rows as a smaller row group.
+    if waiting > 0:
+        writer.write_table(pyarrow.Table.from_batches(batches, schema=schema), row_group_size=rowGroupSize)
+    writer.close()
+    seconds = time.perf_counter() - start
+    print("Successfully wrote {} rows to {}.".format(NUMBER_ROWS, parquet['file']))
+
+    # Report the size of the file and how fast it was written.
+    megabytes = os.path.getsize(parquet['file']) / (1024 * 1024)
+    print("Wrote {:.1f} MB in {:.2f} seconds, {:.1f} MB/sec, {:.0f} rows/sec.".format(
+        megabytes, seconds, megabytes / max(seconds, 1e-9), NUMBER_ROWS / max(seconds, 1e-9)))
+
+# Returns the Arrow schema of the GeoParquet file, with the pkid, the columns and the point as WKB, and the GeoParquet metadata.
+def parquetSchema(columns):
+
+    fields = [pyarrow.field('pkid', pyarrow.int64(), nullable=False)]
+    for column in columns:
+        if column['type'] == 'text':
+            arrowType = pyarrow.string()
+        elif column['type'] == 'int':
+            # Use 64 bit integers if the bounds don't fit in 32 bits, the same as the BIGINT of the table.
+            arrowType = pyarrow.int32() if -2 ** 31 <= column['min'] and column['max'] < 2 ** 31 else pyarrow.int64()
+        elif column['type'] == 'float':
+            arrowType = pyarrow.float64()
+        else:
+            arrowType = pyarrow.timestamp('s')
+        fields.append(pyarrow.field(column['name'], arrowType, nullable=column['nulls'] > 0))
+    fields.append(pyarrow.field('thegeom', pyarrow.binary(), nullable=False))
+
+    # The GeoParquet metadata marks thegeom as WKB points, with no crs meaning longitude and latitude on WGS 84.
+    geo = {'version': '1.0.0', 'primary_column': 'thegeom', 'columns': {'thegeom': {'encoding': 'WKB', 'geometry_types': ['Point']}}}
+    return pyarrow.schema(fields, metadata={'geo': json.dumps(geo)})
+
+# Turns a block of rows into an Arrow record batch of the schema, numbering the rows from its first pkid.
+def parquetBatch(schema, columns, block, firstPkid):
+
+    xs, ys, values = block
+    arrays = [pyarrow.array(np.arange(firstPkid, firstPkid + len(xs), dtype=np.int64))]
+    for column, (columnValues, nulls), field in zip(columns, values, list(schema)[1:-1]):
+        arrays.append(pyarrow.array(columnValues, type=field.type, mask=nulls))
+    # Write every point as WKB at once.
+    arrays.append(pyarrow.array(shapely.to_wkb(shapely.points(xs, ys)), type=pyarrow.binary()))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+# Opens the SQL file for writing text through one large buffer, compressing it as it is written if asked for.
+def openSqlFile(path, output):
+
+    bufferSize = output['bufferSize'] * 1024
+    if output['compression'] == 'none':
+        return open(path, "w", buffering=bufferSize)
+
+    # The text is buffered before it reaches the compressor so it compresses large chunks, nothing is held uncompressed beyond the buffer.
+    if output['compression'] == 'gzip':
+        compressed = gzip.open(path, "wb", compresslevel=output['compressionLevel'])
+    else:
+        compressor = zstandard.ZstdCompressor(level=output['compressionLevel'], threads=output['compressionThreads'] if output['compressionThreads'] > 1 else 0)
+        compressed = compressor.stream_writer(open(path, "wb"), write_return_read=True, closefd=True)
+    return io.TextIOWrapper(io.BufferedWriter(compressed, bufferSize))
+
+# Reads the .ini file once, checks every section the target needs and returns the settings of the run.
+def loadRunConfig(fileName, target):
 
     # create a parser.
     parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+    # read config file, closing if it can't be read.
+    try:
+        found = parser.read(fileName)
+    except Exception:
+        print(".ini file could not be read.\nClosed.")
+        exit()
+    if len(found) == 0:
+        print(".ini file not found.\nClosed.")
+        exit()
+
+    # Only the database target needs [postgresql], only the sql target needs [SQLFile] and only the parquet target needs [ParquetFile].
+    database = config(parser) if target == 'database' else None
+    sqlFile = getSqlFile(parser) if target == 'sql' else None
+
+    return RunConfig(
+        fileName=fileName,
+        database=frozenSection(database),
+        numPoints=getNumPoints(parser),
+        geojson=frozenSection(getGeojson(parser)),
+        tableName=getTableName(parser),
+        sqlFile=sqlFile,
+        cache=frozenSection(getCache(parser)),
+        sampling=frozenSection(getSampling(parser)),
+        generation=frozenSection(getGeneration(parser)),
+        columns=tuple(frozenSection(column) for column in getColumns(parser)),
+        load=frozenSection(getLoad(parser)),
+        output=frozenSection(getOutput(parser)) if target == 'sql' else None,
+        parquet=frozenSection(getParquet(parser)) if target == 'parquet' else None)
+
+# Returns a read-only view of a copy of a section's settings, or None if the run doesn't use the section.
+def frozenSection(section):
+
+    if section is None:
+        return None
+    return types.MappingProxyType(dict(section))
+
+# Read-only sections are sent to worker processes as a copy of their items and frozen again there.
+copyreg.pickle(types.MappingProxyType, lambda section: (frozenSection, (dict(section),)))
+
+# Config function takes in the parsed .ini file and acquires the database connect information from it
+def config(parser):
 
     # Check parser for section of name 'postgresql'.
     db = {}     # Create empty list to store config information.
@@ -180,20 +547,15 @@ def config(fileName):
             # Move everything from params list to db list.
             
     else:
-        # If no 'postgresql' section found, skip.
-        raise Exception(
-            'Section {0} not found in the {1} file'.format(section, fileName))
+        # If no 'postgresql' section found, end program.
+        print("No [postgresql] in .ini file.\nClosed.")
+        exit()
     
     # Return the db list.
     return db
 
-# Takes in the name of the .ini file, finds the TableName section and finds the table name.
-def getTableName(fileName):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+# Takes in the parsed .ini file, finds the TableName section and finds the table name.
+def getTableName(parser):
 
     # Check parser for section of name 'TableName'.
     if parser.has_section('TableName'):
@@ -207,13 +569,8 @@ def getTableName(fileName):
     # Stores the name of the table.
     return TABLE_NAME
 
-# Takes in the name of the .ini file, finds the numPoints section and finds out how many points are wanted.
-def getNumPoints(fileName):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+# Takes in the parsed .ini file, finds the numPoints section and finds out how many points are wanted.
+def getNumPoints(parser):
 
     # Check parser for section of name 'numPoints'.
     if parser.has_section('numPoints'):
@@ -237,46 +594,290 @@ def getNumPoints(fileName):
         print("numPoints must be a positive integer.")
         exit()    
 
-# Takes in the name of the .ini file and finds out which file has the geojson polygon.
-def getPolygon(fileName):
+# Takes in the parsed .ini file and finds out which file has the geojson polygon and which of its features to keep.
+def getGeojson(parser):
 
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+    # Check parser for section of name 'geojson'.
+    if parser.has_section('geojson'):
+        shapeBounds = parser.items('geojson')
+        # Store items in section 'geojson' in shapeBounds list of tuples.
+    else:
+        print("No [geojson] in .ini file.\nClosed.")
+        exit()
+    # Create dictionary to store the geojson options, starting with the name of the geojson file.
+    geojson = {}
+    geojson['file'] = (shapeBounds[0][1])
+
+    # Only keep features whose property filterProperty has one of filterValues, if given.
+    geojson['filterProperty'] = parser.get('geojson', 'filterProperty', fallback=None)
+    filterValues = parser.get('geojson', 'filterValues', fallback=None)
+    if (geojson['filterProperty'] is None) != (filterValues is None):
+        print("filterProperty and filterValues must be given together.\nClosed.")
+        exit()
+    if filterValues is not None:
+        filterValues = frozenset(value.strip() for value in filterValues.split(","))
+    geojson['filterValues'] = filterValues
+
+    # Only keep features that overlap bbox = minX, minY, maxX, maxY, if given.
+    bbox = parser.get('geojson', 'bbox', fallback=None)
+    if bbox is not None:
+        try:
+            bbox = shapely.box(*[float(value) for value in bbox.split(",")])
+        except (TypeError, ValueError):
+            print("bbox must be of the form minX, minY, maxX, maxY.\nClosed.")
+            exit()
+    geojson['bbox'] = bbox
+
+    # Return the geojson dictionary.
+    return geojson
+
+# Takes in the settings of the run and loads the polygon from the geojson file.
+def getPolygon(run):
+
+    # Acquire the geojson file and its filters from the run.
+    geojsonName = run.geojson['file']
+    filterProperty = run.geojson['filterProperty']
+    filterValues = run.geojson['filterValues']
+    bbox = run.geojson['bbox']
 
     try:
-        # Check parser for section of name 'geojson'.
-        if parser.has_section('geojson'):
-            shapeBounds = parser.items('geojson')
-            # Store items in section 'geojson' in shapeBounds list of tuples.
-        else:
-            print("No [geojson] in .ini file.\nClosed.")
+        # Use the repaired polygon from the cache if this GeoJSON file has been loaded before with the same filters.
+        cache = run.cache
+        if cache['enabled']:
+            filterKey = sorted(filterValues) if filterValues is not None else None
+            bboxKey = bbox.bounds if bbox is not None else None
+            cacheFile = cachePath(cache, (fileHash(geojsonName), 'buffer0', filterProperty, filterKey, bboxKey), '.wkb')
+            cached = readCache(cacheFile)
+            if cached is not None:
+                return shapely.from_wkb(cached)
+
+        # Read the features from the GeoJSON file one at a time so the whole file is never in memory.
+        shapes = []
+        for feature in iterGeojsonFeatures(geojsonName):
+            # Skip features whose property doesn't match the filter.
+            if filterProperty is not None:
+                properties = feature.get("properties") or {}
+                if str(properties.get(filterProperty)) not in filterValues:
+                    continue
+            # Define shape as "geometry" from GeoJSON file, skip it if it is outside the bbox.
+            featureShape = shape(feature["geometry"])
+            if bbox is not None and not featureShape.intersects(bbox):
+                continue
+            # buffer(0) removes overlapping coordinates.
+            shapes.append(featureShape.buffer(0))
+
+        if len(shapes) == 0:
+            print("No features found in GeoJSON file.\nClosed.")
             exit()
-        # Store value of geojson name in geojsonName
-        geojsonName = (shapeBounds[0][1])
-    
-        # Load in GeoJSON file from .ini file as f and obtain "features" object.
-        with open(geojsonName) as f:
-            features = json.load(f)["features"]
-        
-        # Define shape as "geometry" from GeoJSON file and buffer(0) removes overlapping coordinates.
-        poly = (GeometryCollection([shape(feature["geometry"]).buffer(0) for feature in features]))
+        poly = GeometryCollection(shapes)
+
+        # Points can only be placed in a polygon with an area, a sliver or line has none and no bounding box to sample from.
+        if poly.is_empty or poly.area == 0:
+            print("GeoJSON features have no area to generate points in.\nClosed.")
+            exit()
+
+        # Store the repaired polygon in the cache as WKB.
+        if cache['enabled']:
+            writeCache(cache, cacheFile, shapely.to_wkb(poly))
         return poly
 
     except FileNotFoundError:
         # If file not found, end program.
         print("GeoJSON file not found.")
         exit()
+    except (ValueError, KeyError):
+        # If the file isn't a GeoJSON feature collection, end program.
+        print("GeoJSON file must be a FeatureCollection.\nClosed.")
+        exit()
     # Stores the name of the geojson file with the bounds of the polygon.
 
-# Takes in the name of the .ini file and finds out which file will be wrote to to create an SQL file.
-def getSqlFile(fileName):
+# Reads a GeoJSON FeatureCollection and yields its features one at a time, only holding about one feature in memory.
+def iterGeojsonFeatures(geojsonName, chunkSize=1 << 20):
+
+    decoder = json.JSONDecoder()
+    whitespace = re.compile(r"\s*")
+
+    with open(geojsonName) as f:
+        # The buffer holds the text read so far from position onwards.
+        state = {'buffer': "", 'position': 0, 'end': False}
+
+        # Reads more text into the buffer, at least doubling what is left so large features don't get parsed over and over.
+        def fill():
+            chunk = f.read(max(chunkSize, len(state['buffer']) - state['position']))
+            if chunk == "":
+                state['end'] = True
+            state['buffer'] = state['buffer'][state['position']:] + chunk
+            state['position'] = 0
+
+        # Skips whitespace and returns the next character without using it up.
+        def peek():
+            while True:
+                state['position'] = whitespace.match(state['buffer'], state['position']).end()
+                if state['position'] < len(state['buffer']):
+                    return state['buffer'][state['position']]
+                if state['end']:
+                    raise ValueError("GeoJSON file ended early")
+                fill()
+
+        # Uses up the next character, which must be one of the expected ones, and returns it.
+        def expect(expected):
+            character = peek()
+            if character not in expected:
+                raise ValueError("Expected one of {} in GeoJSON file".format(expected))
+            state['position'] += 1
+            return character
+
+        # Decodes the next JSON value, reading more text until the whole value is in the buffer.
+        def value():
+            peek()
+            while True:
+                try:
+                    result, end = decoder.raw_decode(state['buffer'], state['position'])
+                    # A number is only whole once a character that can't carry it on follows it, such as "12" cut from "12.5".
+                    number = isinstance(result, (int, float)) and not isinstance(result, bool)
+                    if not number or state['end'] or (end < len(state['buffer']) and state['buffer'][end] not in "0123456789.eE+-"):
+                        state['position'] = end
+                        return result
+                except json.JSONDecodeError:
+                    if state['end']:
+                        raise
+                fill()
+
+        # Walk through the keys of the top level object until "features" is found.
+        expect("{")
+        if peek() == "}":
+            raise KeyError("features")
+        while True:
+            key = value()
+            expect(":")
+            if key == "features":
+                break
+            # Skip the values of every other key.
+            value()
+            if expect(",}") == "}":
+                raise KeyError("features")
+
+        # Yield every feature in the "features" array.
+        expect("[")
+        if peek() == "]":
+            return
+        while True:
+            yield value()
+            if expect(",]") == "]":
+                return
+
+# Takes in the parsed .ini file and finds out where boundary geometry is cached and how much of it to keep.
+def getCache(parser):
+
+    # Create dictionary to store cache options, [cache] is optional so use the defaults if it is missing.
+    cache = {}
+    try:
+        cache['enabled'] = parser.getboolean('cache', 'enabled', fallback=True)
+    except ValueError:
+        print("cache enabled must be yes or no.\nClosed.")
+        exit()
+    cache['directory'] = parser.get('cache', 'directory', fallback=os.path.join(os.path.expanduser('~'), '.cache', 'PointGenerator'))
+
+    # Largest total size of the cache in megabytes and oldest file to keep in days.
+    try:
+        cache['maxSize'] = parser.getfloat('cache', 'maxSize', fallback=1024)
+        cache['maxAge'] = parser.getfloat('cache', 'maxAge', fallback=30)
+    except ValueError:
+        print("cache maxSize and maxAge must be positive numbers.\nClosed.")
+        exit()
+
+    if cache['maxSize'] <= 0 or cache['maxAge'] <= 0:
+        print("cache maxSize and maxAge must be positive numbers.\nClosed.")
+        exit()
+
+    # Return the cache dictionary.
+    return cache
+
+# Returns the SHA-256 hash of the contents of a file, reading it in chunks.
+def fileHash(path):
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# Returns the path of the cache file for the given key parts.
+def cachePath(cache, keyParts, extension):
+
+    key = "|".join(str(part) for part in (CACHE_VERSION,) + tuple(keyParts))
+    return os.path.join(cache['directory'], hashlib.sha256(key.encode()).hexdigest() + extension)
+
+# Returns the bytes of a cache file, or None if it isn't cached.
+def readCache(path):
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    # Mark the file as used so it is evicted last.
+    os.utime(path)
+    return data
+
+# Writes the bytes to a cache file and evicts old files if the cache is too big.
+def writeCache(cache, path, data):
+
+    os.makedirs(cache['directory'], exist_ok=True)
+    # Write to a temporary file first so other runs never read half a file.
+    tempPath = "{}.{}.tmp".format(path, os.getpid())
+    with open(tempPath, "wb") as f:
+        f.write(data)
+    os.replace(tempPath, path)
+    evictCache(cache)
+
+# Deletes cache files older than maxAge, then the least recently used files until the cache is within maxSize.
+def evictCache(cache):
+
+    # Acquire the age and size of every file in the cache.
+    entries = []
+    for entry in os.scandir(cache['directory']):
+        if entry.is_file() and not entry.name.endswith(".tmp"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+
+    oldest = time.time() - cache['maxAge'] * 86400
+    total = sum(size for _, size, _ in entries)
+    for modified, size, path in entries:
+        if modified >= oldest and total <= cache['maxSize'] * 1024 * 1024:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+# Returns the arrays of the sampler that are kept in the cache, building and caching them if they aren't there yet.
+def getCachedSamplerArrays(poly, sampling, cache):
+
+    if not cache['enabled'] or sampling['method'] not in SAMPLER_CACHE_KEYS:
+        return None
+
+    # Key the arrays on the polygon itself and the options they were built with.
+    options = sampling['gridSize'] if sampling['method'] == 'grid' else ''
+    path = cachePath(cache, (hashlib.sha256(shapely.to_wkb(poly)).hexdigest(), sampling['method'], options), '.npz')
+    data = readCache(path)
+    if data is not None:
+        with np.load(io.BytesIO(data)) as arrays:
+            return {key: arrays[key] for key in SAMPLER_CACHE_KEYS[sampling['method']]}
+
+    # Build the sampler and store its arrays in the cache.
+    sampler = prepareSampler(poly, sampling)
+    arrays = {key: np.asarray(sampler[key]) for key in SAMPLER_CACHE_KEYS[sampling['method']]}
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    writeCache(cache, path, buffer.getvalue())
+    return arrays
+
+# Takes in the parsed .ini file and finds out which file will be wrote to to create an SQL file.
+def getSqlFile(parser):
 
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
     # Check parser for section of name 'geojson'.
     if parser.has_section('SQLFile'):
         sqlFile = parser.items('SQLFile')
@@ -292,384 +893,1004 @@ def getSqlFile(fileName):
         exit()
     return fileSql
 
-# Iterator takes in points to be commited, database cursor, database and the name of the table.
-def pointIterDb(generated_points, cur, con, TABLE_NAME, fileName):
-    
-    # Acquire the lists 'check' and 'values' from addColumnsDb.
-    check = addColumnsDb(fileName, cur, con)
-    # Store first tuple in check_bool and second in check_bounds.
-    check_bool = check[0]
-    check_bounds = check[1]
-    
-    # Acquire inputted string length from .ini file
+# Takes in the parsed .ini file and finds out how the rows are written to the SQL file.
+def getOutput(parser):
+
+    # Create dictionary to store output options, any options in [SQLFile] come after the file name.
+    output = {}
+    # 'insert' writes an INSERT statement per row, 'copy' writes the rows in one COPY ... FROM stdin block that loads at COPY speed.
+    # 'multi' writes INSERT statements of rowsPerInsert rows each, wrapped in BEGIN and COMMIT every commitEvery rows.
+    output['format'] = parser.get('SQLFile', 'format', fallback='insert')
+    if output['format'] not in ('insert', 'copy', 'multi'):
+        print("SQLFile format must be one of: insert, copy, multi.\nClosed.")
+        exit()
+
+    # Number of rows in each multi-row INSERT and number of rows between commits, 0 leaves out BEGIN and COMMIT.
     try:
-        strLen = int(check_bounds[0])
+        output['rowsPerInsert'] = parser.getint('SQLFile', 'rowsPerInsert', fallback=1000)
+        output['commitEvery'] = parser.getint('SQLFile', 'commitEvery', fallback=100000)
     except ValueError:
-        print("strLen must be a positive integer.\nClosed.")
+        print("rowsPerInsert must be a positive integer and commitEvery 0 or more.\nClosed.")
         exit()
 
-    if strLen <= 0:
-        print("strLen must be a positive integer.\nClosed.")
+    if output['rowsPerInsert'] <= 0 or output['commitEvery'] < 0:
+        print("rowsPerInsert must be a positive integer and commitEvery 0 or more.\nClosed.")
         exit()
-    # Acquire inputted int bounds from .ini file
+
+    # Size in kilobytes of the buffer the SQL file is written through.
     try:
-        intStart = int(check_bounds[1])
+        output['bufferSize'] = parser.getint('SQLFile', 'bufferSize', fallback=4096)
     except ValueError:
-        print("intStart must be an integer.\nClosed.")
+        print("bufferSize must be a positive integer.\nClosed.")
+        exit()
+
+    if output['bufferSize'] <= 0:
+        print("bufferSize must be a positive integer.\nClosed.")
+        exit()
+
+    # 'gzip' and 'zstd' compress the SQL file as it is written, by default chosen from a .gz, .zst or .zstd file name.
+    fileName = getSqlFile(parser)
+    if fileName.endswith(".gz"):
+        compression = 'gzip'
+    elif fileName.endswith((".zst", ".zstd")):
+        compression = 'zstd'
+    else:
+        compression = 'none'
+    output['compression'] = parser.get('SQLFile', 'compression', fallback=compression)
+    if output['compression'] not in ('none', 'gzip', 'zstd'):
+        print("compression must be one of: none, gzip, zstd.\nClosed.")
         exit()
+
+    if output['compression'] == 'zstd' and zstandard is None:
+        print("zstd compression needs the zstandard package, pip install zstandard.\nClosed.")
+        exit()
+
+    # Compression level, 1 to 9 for gzip and 1 to 22 for zstd, and number of threads zstd compresses with.
     try:
-        intEnd = int(check_bounds[2])
+        output['compressionLevel'] = parser.getint('SQLFile', 'compressionLevel', fallback=6 if output['compression'] == 'gzip' else 3)
+        output['compressionThreads'] = parser.getint('SQLFile', 'compressionThreads', fallback=1)
     except ValueError:
-        print("intEnd must be an integer.\nClosed.")
+        print("compressionLevel and compressionThreads must be positive integers.\nClosed.")
         exit()
 
-    if intStart >= intEnd:
-        print("intStart must be smaller than intEnd.\nClosed.")
+    if not 1 <= output['compressionLevel'] <= (9 if output['compression'] == 'gzip' else 22) or output['compressionThreads'] <= 0:
+        print("compressionLevel must be 1 to 9 for gzip or 1 to 22 for zstd and compressionThreads a positive integer.\nClosed.")
         exit()
 
-    # Acquire inputted time stamp start date from .ini file and change the format to suit datetime.date
-    startDate = list(check_bounds[3])
-    # Change inputted bounds into desired int value.
+    if output['compressionThreads'] > 1 and output['compression'] != 'zstd':
+        print("compressionThreads needs compression=zstd.\nClosed.")
+        exit()
+
+    # Number of data files written at the same time by worker processes, each with its own range of rows.
     try:
-        startYear = int(startDate[0]+startDate[1]+startDate[2]+startDate[3])
+        output['shards'] = parser.getint('SQLFile', 'shards', fallback=1)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("shards must be a positive integer.\nClosed.")
+        exit()
+
+    if output['shards'] <= 0:
+        print("shards must be a positive integer.\nClosed.")
         exit()
+
+    # Return the output dictionary.
+    return output
+
+# Takes in the parsed .ini file and finds the GeoParquet file name and how it is written.
+def getParquet(parser):
+
+    # Check parser for section of name 'ParquetFile'.
+    if not parser.has_section('ParquetFile'):
+        print("No [ParquetFile] in .ini file.\nClosed.")
+        exit()
+    if pyarrow is None:
+        print("GeoParquet files need the pyarrow package, pip install pyarrow.\nClosed.")
+        exit()
+
+    # Create dictionary to store the file name and how it is written.
+    parquet = {}
+    parquet['file'] = parser.get('ParquetFile', 'file', fallback=None)
+    if not parquet['file']:
+        print("No Parquet file name found.\nClosed.")
+        exit()
+
+    # Number of rows in each row group, only the rows of one row group are held in memory.
     try:
-        startMonth = int(startDate[5]+startDate[6])
+        parquet['rowGroupSize'] = parser.getint('ParquetFile', 'rowGroupSize', fallback=100000)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("rowGroupSize must be a positive integer.\nClosed.")
+        exit()
+
+    if parquet['rowGroupSize'] <= 0:
+        print("rowGroupSize must be a positive integer.\nClosed.")
+        exit()
+
+    # Compression of the column chunks and its level, the level is left to pyarrow if it isn't given.
+    parquet['compression'] = parser.get('ParquetFile', 'compression', fallback='zstd')
+    if parquet['compression'] not in ('none', 'snappy', 'gzip', 'zstd'):
+        print("Parquet compression must be one of: none, snappy, gzip, zstd.\nClosed.")
         exit()
+
     try:
-        startDay = int(startDate[8]+startDate[9])
+        parquet['compressionLevel'] = parser.getint('ParquetFile', 'compressionLevel', fallback=None)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("compressionLevel must be an integer.\nClosed.")
         exit()
-    
-    # Acquire inputted time stamp end date from .ini file and change the format to suit datetime.date
-    endDate = list(check_bounds[4])
-    # Change inputted bounds into desired int value.
+
+    if parquet['compressionLevel'] is not None and parquet['compression'] not in ('gzip', 'zstd'):
+        print("compressionLevel needs compression=gzip or zstd.\nClosed.")
+        exit()
+
+    # Dictionary encoding stores repeated values once per column chunk.
     try:
-        endYear = int(endDate[0]+endDate[1]+endDate[2]+endDate[3])
+        parquet['dictionary'] = parser.getboolean('ParquetFile', 'dictionary', fallback=True)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("dictionary must be yes or no.\nClosed.")
+        exit()
+
+    # Return the parquet dictionary.
+    return parquet
+
+# Takes in the parsed .ini file and finds out which sampler should be used to generate the points.
+def getSampling(parser):
+
+    # Create dictionary to store sampling options, [sampling] is optional so use the defaults if it is missing.
+    sampling = {}
+    # 'vectorized' draws candidates in batches with numpy, 'loop' is the original one point at a time sampler.
+    # 'strtree' also splits the polygon into prepared parts held in an STRtree.
+    # 'triangulate' cuts the polygon into triangles and places points in them without any rejected draws.
+    # 'stratified' splits the points between the features by area and samples each within its own bounds.
+    # 'grid' indexes the bounds as interior, exterior and boundary cells so only boundary cells need the exact test.
+    sampling['method'] = parser.get('sampling', 'method', fallback='vectorized')
+    if sampling['method'] not in ('loop', 'vectorized', 'strtree', 'triangulate', 'stratified', 'grid'):
+        print("sampling method must be one of: loop, vectorized, strtree, triangulate, stratified, grid.\nClosed.")
         exit()
+    # Number of candidate points drawn per batch by the vectorized sampler.
     try:
-        endMonth = int(endDate[5]+endDate[6])
+        sampling['batchSize'] = parser.getint('sampling', 'batchSize', fallback=100000)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("batchSize must be a positive integer.\nClosed.")
         exit()
+
+    if sampling['batchSize'] <= 0:
+        print("batchSize must be a positive integer.\nClosed.")
+        exit()
+    # Number of cells along each side of the grid sampler's index.
     try:
-        endDay = int(endDate[8]+endDate[9])
+        sampling['gridSize'] = parser.getint('sampling', 'gridSize', fallback=256)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("gridSize must be a positive integer.\nClosed.")
         exit()
 
-    if startYear > endYear:
-        print("timeStart must be before timeEnd.\nClosed.")
+    if sampling['gridSize'] <= 0:
+        print("gridSize must be a positive integer.\nClosed.")
         exit()
-    elif startYear == endYear and startMonth > endMonth:
-        print("timeStart must be before timeEnd.\nClosed.")
+
+    # Number of points to benchmark the sampler against the original sampler with, 0 skips the benchmark.
+    try:
+        sampling['benchmark'] = parser.getint('sampling', 'benchmark', fallback=0)
+    except ValueError:
+        print("benchmark must be a positive integer.\nClosed.")
         exit()
-    elif startYear == endYear and startMonth == endMonth and startDay >= endDay:
-        print("timeStart must be before timeEnd.\nClosed.")
+
+    if sampling['benchmark'] < 0:
+        print("benchmark must be a positive integer.\nClosed.")
         exit()
 
-    # Iterate through every point generated. 
-    for aPoint in generated_points:
-        # Create random string with size inputted in .ini file.
-        random_string = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(strLen))
-        # Create random int with bounds inputted from .ini file.
-        random_int = randint(intStart, intEnd)
-        # Take a random number, translate that to seconds and develops that into HH:MM:SS format.
-        random_timestamp = datetime.timedelta(seconds=randrange(86400))
-        # Set a range based off of the inputted dates.
-        start_date = datetime.date(startYear, startMonth, startDay)
-        end_date = datetime.date(endYear, endMonth, endDay)
-        # Calculate range.
-        time_between_dates = end_date - start_date
-        # Reformat into days.
-        days_between_dates = time_between_dates.days
-        # Randomise the days.
-        random_number_of_days = random.randrange(days_between_dates)
-        # Format into YY:MM:DD.
-        random_date = start_date + datetime.timedelta(days=random_number_of_days)
-
-        # Set 'y' value to Latitude and 'x' value to Longitude.
-        pointLatitude = aPoint.y
-        pointLongitude = aPoint.x
-
-        if check_bool[0] == True and check_bool[1] == True and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, randInt, randTime, theGeom) VALUES ('{}', {}, '{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, random_int, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    # Return the sampling dictionary.
+    return sampling
 
-        elif check_bool[0] == False and check_bool[1] == True and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randInt, randTime, theGeom) VALUES ({}, '{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_int, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+# Takes in the parsed .ini file and finds out how the points should be generated.
+def getGeneration(parser):
 
-        elif check_bool[0] == True and check_bool[1] == False and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, randTime, theGeom) VALUES ('{}','{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    # Create dictionary to store generation options, [generation] is optional so use the defaults if it is missing.
+    generation = {}
+    # Number of points generated at a time, only one block of points is held in memory.
+    try:
+        generation['blockSize'] = parser.getint('generation', 'blockSize', fallback=100000)
+    except ValueError:
+        print("blockSize must be a positive integer.\nClosed.")
+        exit()
 
-        elif check_bool[0] == True and check_bool[1] == True and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, randInt, theGeom) VALUES ('{}', {}, ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, random_int, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    if generation['blockSize'] <= 0:
+        print("blockSize must be a positive integer.\nClosed.")
+        exit()
 
-        elif check_bool[0] == True and check_bool[1] == False and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, theGeom) VALUES ('{}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    # Number of worker processes generating blocks at the same time.
+    try:
+        generation['workers'] = parser.getint('generation', 'workers', fallback=1)
+    except ValueError:
+        print("workers must be a positive integer.\nClosed.")
+        exit()
 
-        elif check_bool[0] == False and check_bool[1] == True and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randInt, theGeom) VALUES ({}, ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_int, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    if generation['workers'] <= 0:
+        print("workers must be a positive integer.\nClosed.")
+        exit()
 
-        elif check_bool[0] == False and check_bool[1] == False and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randTime, theGeom) VALUES ('{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    # Master seed every random stream is spawned from, without one the output can't be reproduced.
+    try:
+        generation['seed'] = parser.getint('generation', 'seed', fallback=None)
+    except ValueError:
+        print("seed must be a positive integer.\nClosed.")
+        exit()
 
-        elif check_bool[0] == False and check_bool[1] == False and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (theGeom) VALUES (ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, pointLongitude, pointLatitude)
-            # Execute query string to database
-            try:
-                cur.execute(queryStr)
-            except Exception:
-                print("Table columns have changed.\nClosed.")
-                exit()
-            # Commit changes to database
-            con.commit()
+    if generation['seed'] is not None and generation['seed'] < 0:
+        print("seed must be a positive integer.\nClosed.")
+        exit()
 
-# Iterates through generated points and gives them a random string for the txtfield.
-def pointIterSql(generated_points, sqlFile, TABLE_NAME, fileName):
+    # 'crypto' draws the attribute columns from the operating system's secure source, 'fast' from the seeded generator.
+    generation['source'] = parser.get('generation', 'source', fallback='fast' if generation['seed'] is not None else 'crypto')
+    if generation['source'] not in ('crypto', 'fast'):
+        print("source must be one of: crypto, fast.\nClosed.")
+        exit()
 
-    # Acquire the lists 'check' and 'values' from addColumnsSql
-    check = addColumnsSql(fileName, sqlFile)
-    # Store first tuple in check_bool and second in check_bounds.
-    check_bool = check[0]
-    check_bounds = check[1]
-    
-    # Acquire inputted string length from .ini file
+    if generation['source'] == 'crypto' and generation['seed'] is not None:
+        print("source=crypto can't be seeded, use source=fast with a seed.\nClosed.")
+        exit()
+
+    # 'stream' gives each block a random stream spawned from the seed.
+    # 'counter' works out every row's point and attributes straight from the seed and the row number.
+    generation['rng'] = parser.get('generation', 'rng', fallback='stream')
+    if generation['rng'] not in ('stream', 'counter'):
+        print("rng must be one of: stream, counter.\nClosed.")
+        exit()
+
+    if generation['rng'] == 'counter' and generation['seed'] is None:
+        print("rng=counter needs a seed.\nClosed.")
+        exit()
+
+    # First row and the row after the last one to generate, so a run can be resumed or split into ranges.
     try:
-        strLen = int(check_bounds[0])
+        generation['startRow'] = parser.getint('generation', 'startRow', fallback=0)
+        generation['endRow'] = parser.getint('generation', 'endRow', fallback=None)
     except ValueError:
-        print("strLen must be a positive integer.\nClosed.")
+        print("startRow and endRow must be positive integers.\nClosed.")
         exit()
 
-    if strLen <= 0:
-        print("strLen must be a positive integer.\nClosed.")
+    if generation['rng'] != 'counter' and (generation['startRow'] != 0 or generation['endRow'] is not None):
+        print("startRow and endRow need rng=counter.\nClosed.")
         exit()
-    # Acquire inputted int bounds from .ini file
+
+    # Return the generation dictionary.
+    return generation
+
+# Takes in the parsed .ini file and finds out how the rows should be loaded into the database.
+def getLoad(parser):
+
+    # Create dictionary to store load options, [load] is optional so use the defaults if it is missing.
+    load = {}
+    # 'insert' sends one INSERT statement per row, 'copy' streams every block with COPY ... FROM STDIN.
+    # 'batch' sends INSERT statements of many rows with the values bound as parameters, for servers that don't allow COPY.
+    # 'server' sends the polygon once and generates every row on the server with ST_GeneratePoints.
+    load['method'] = parser.get('load', 'method', fallback='insert')
+    if load['method'] not in ('insert', 'copy', 'batch', 'server'):
+        print("load method must be one of: insert, copy, batch, server.\nClosed.")
+        exit()
+
+    # Number of rows in each INSERT statement of the batch method and number of rows between commits.
     try:
-        intStart = int(check_bounds[1])
+        load['batchSize'] = parser.getint('load', 'batchSize', fallback=1000)
+        load['commitEvery'] = parser.getint('load', 'commitEvery', fallback=100000)
     except ValueError:
-        print("intStart must be an integer.\nClosed.")
+        print("batchSize and commitEvery must be positive integers.\nClosed.")
         exit()
+
+    if load['batchSize'] <= 0 or load['commitEvery'] <= 0:
+        print("batchSize and commitEvery must be positive integers.\nClosed.")
+        exit()
+
+    # Number of database connections loading blocks at the same time, each in its own transaction.
     try:
-        intEnd = int(check_bounds[2])
+        load['connections'] = parser.getint('load', 'connections', fallback=1)
     except ValueError:
-        print("intEnd must be an integer.\nClosed.")
+        print("connections must be a positive integer.\nClosed.")
         exit()
 
-    if intStart >= intEnd:
-        print("intStart must be smaller than intEnd.\nClosed.")
+    if load['connections'] <= 0:
+        print("connections must be a positive integer.\nClosed.")
+        exit()
+
+    if load['connections'] > 1 and load['method'] not in ('copy', 'batch'):
+        print("connections above 1 need method=copy or method=batch.\nClosed.")
+        exit()
+
+    # 'standard' creates the table with its spatial index before loading.
+    # 'fast' creates a new table UNLOGGED without an index, then builds the index, analyzes it and sets it LOGGED after loading.
+    load['profile'] = parser.get('load', 'profile', fallback='standard')
+    if load['profile'] not in ('standard', 'fast'):
+        print("load profile must be one of: standard, fast.\nClosed.")
         exit()
 
-    # Acquire inputted time stamp start date from .ini file and change the format to suit datetime.date
-    startDate = list(check_bounds[3])
-    # Change inputted bounds into desired int value.
+    # CLUSTER the table on its spatial index after a fast load.
     try:
-        startYear = int(startDate[0]+startDate[1]+startDate[2]+startDate[3])
+        load['cluster'] = parser.getboolean('load', 'cluster', fallback=False)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("cluster must be yes or no.\nClosed.")
         exit()
+
+    # Also time loading the same number of rows generated in Python with COPY after a server load.
     try:
-        startMonth = int(startDate[5]+startDate[6])
+        load['benchmark'] = parser.getboolean('load', 'benchmark', fallback=False)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("load benchmark must be yes or no.\nClosed.")
+        exit()
+
+    if load['benchmark'] and load['method'] != 'server':
+        print("load benchmark needs method=server.\nClosed.")
         exit()
+
+    # The server draws its own random numbers, so it can't work rows out from their row numbers or generate only a range of them.
+    if load['method'] == 'server' and (parser.get('generation', 'rng', fallback='stream') == 'counter'
+            or parser.has_option('generation', 'startRow') or parser.has_option('generation', 'endRow')):
+        print("method=server can't be used with rng=counter, startRow or endRow.\nClosed.")
+        exit()
+
+    # Generate and encode the next blocks in a thread while the current block is loaded, holding at most queueSize blocks.
     try:
-        startDay = int(startDate[8]+startDate[9])
+        load['pipeline'] = parser.getboolean('load', 'pipeline', fallback=False)
+        load['queueSize'] = parser.getint('load', 'queueSize', fallback=4)
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("pipeline must be yes or no and queueSize a positive integer.\nClosed.")
         exit()
-    
-    # Acquire inputted time stamp end date from .ini file and change the format to suit datetime.date
-    endDate = list(check_bounds[4])
-    # Change inputted bounds into desired int value.
+
+    if load['queueSize'] <= 0:
+        print("queueSize must be a positive integer.\nClosed.")
+        exit()
+
+    if load['pipeline'] and (load['method'] == 'server' or load['connections'] > 1):
+        print("pipeline needs method=insert, copy or batch with one connection.\nClosed.")
+        exit()
+
+    # Return the load dictionary.
+    return load
+
+# Takes in the parsed .ini file and finds the bounds of the random string, integer and timestamp columns.
+def getColumnBounds(parser):
+
+    # Search .ini file for section colVals. 
+    if parser.has_section('colVals'):
+        # Store elements of 'colVals' in bounds.
+        bounds = parser.items('colVals')
+    else:
+        print("No [colVals] section in .ini file.\nClosed.")
+        exit()
+
+    # Acquire inputted string length from .ini file
     try:
-        endYear = int(endDate[0]+endDate[1]+endDate[2]+endDate[3])
+        strLen = int(bounds[0][1])
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("strLen must be a positive integer.\nClosed.")
         exit()
+
+    if strLen <= 0:
+        print("strLen must be a positive integer.\nClosed.")
+        exit()
+    # Acquire inputted int bounds from .ini file
     try:
-        endMonth = int(endDate[5]+endDate[6])
+        intStart = int(bounds[1][1])
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("intStart must be an integer.\nClosed.")
         exit()
     try:
-        endDay = int(endDate[8]+endDate[9])
+        intEnd = int(bounds[2][1])
     except ValueError:
-        print("timeStart must be of the form YYYY,MM,DD.\nClosed.")
+        print("intEnd must be an integer.\nClosed.")
         exit()
 
-    if startYear > endYear:
-        print("timeStart must be before timeEnd.\nClosed.")
+    if intStart >= intEnd:
+        print("intStart must be smaller than intEnd.\nClosed.")
         exit()
-    elif startYear == endYear and startMonth > endMonth:
-        print("timeStart must be before timeEnd.\nClosed.")
+
+    if intStart < -2 ** 63 or intEnd > 2 ** 63 - 1:
+        print("intStart and intEnd must be between -2**63 and 2**63-1.\nClosed.")
         exit()
-    elif startYear == endYear and startMonth == endMonth and startDay >= endDay:
+
+    # Acquire inputted time stamp start and end dates of the form YYYY,MM,DD from .ini file.
+    try:
+        start_date = datetime.datetime.strptime(bounds[3][1].strip(), "%Y,%m,%d")
+    except ValueError:
+        print("timeStart must be a real date of the form YYYY,MM,DD.\nClosed.")
+        exit()
+    try:
+        end_date = datetime.datetime.strptime(bounds[4][1].strip(), "%Y,%m,%d")
+    except ValueError:
+        print("timeEnd must be a real date of the form YYYY,MM,DD.\nClosed.")
+        exit()
+
+    if start_date >= end_date:
         print("timeStart must be before timeEnd.\nClosed.")
         exit()
 
-    # Iterate through every point generated. 
-    for aPoint in generated_points:
-        # Create random string with size inputted in .ini file.
-        random_string = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(strLen))
-        # Create random int with bounds inputted from .ini file.
-        random_int = randint(intStart, intEnd)
-        # Take a random number, translate that to seconds and develops that into HH:MM:SS format.
-        random_timestamp = datetime.timedelta(seconds=randrange(86400))
-        # Set a range based off of the inputted dates.
-        start_date = datetime.date(startYear, startMonth, startDay)
-        end_date = datetime.date(endYear, endMonth, endDay)
-        # Calculate range.
-        time_between_dates = end_date - start_date
-        # Reformat into days.
-        days_between_dates = time_between_dates.days
-        # Randomise the days.
-        random_number_of_days = random.randrange(days_between_dates)
-        # Format into YY:MM:DD.
-        random_date = start_date + datetime.timedelta(days=random_number_of_days)
-        
-        # Set 'y' value to Latitude and 'x' value to Longitude.
-        pointLatitude = aPoint.y
-        pointLongitude = aPoint.x
-
-        if check_bool[0] == True and check_bool[1] == True and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, randInt, randTime, theGeom) VALUES ('{}', {}, '{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, random_int, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+    # Create dictionary to store the column bounds.
+    columnBounds = {}
+    columnBounds['strLen'] = strLen
+    columnBounds['intStart'] = intStart
+    columnBounds['intEnd'] = intEnd
+    columnBounds['start'] = start_date
+    columnBounds['end'] = end_date
+
+    # Return the column bounds dictionary.
+    return columnBounds
+
+# Takes in the parsed .ini file and returns the list of columns to generate, from [columns] or the older [addColumn] and [colVals].
+def getColumns(parser):
+
+    # Without a [columns] section, build the same columns from [addColumn] and [colVals].
+    if not parser.has_section('columns'):
+        return legacyColumns(parser)
+
+    # Each line is: name = type, key=value, ... with type one of text, int, float or timestamp.
+    # The parser makes the names lowercase, the same as PostgreSQL does with names that aren't quoted.
+    columns = []
+    for name, spec in parser.items('columns'):
+        if re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name) is None or name.lower() in ('pkid', 'thegeom'):
+            print("Column name {} can't be used.\nClosed.".format(name))
+            exit()
 
-        elif check_bool[0] == False and check_bool[1] == True and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randInt, randTime, theGeom) VALUES ({}, '{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_int, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+        parts = [part.strip() for part in spec.split(",")]
+        column = {'name': name, 'type': parts[0], 'nulls': 0.0}
+        if column['type'] not in COLUMN_TYPES:
+            print("Column {} must have a type of: text, int, float or timestamp.\nClosed.".format(name))
+            exit()
 
-        elif check_bool[0] == True and check_bool[1] == False and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, randTime, theGeom) VALUES ('{}','{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+        # Read the key=value options after the type.
+        options = {}
+        for part in parts[1:]:
+            key, _, value = part.partition("=")
+            options[key.strip()] = value.strip()
 
-        elif check_bool[0] == True and check_bool[1] == True and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, randInt, theGeom) VALUES ('{}', {}, ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, random_int, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+        try:
+            # How often the column is NULL, from 0 to 1.
+            column['nulls'] = float(options.pop('nulls', 0))
+            if column['type'] == 'text':
+                # Length of the random strings.
+                column['length'] = int(options.pop('length', 10))
+                valid = column['length'] > 0
+            elif column['type'] == 'int':
+                # Bounds of the random integers, both included.
+                column['min'] = int(options.pop('min'))
+                column['max'] = int(options.pop('max'))
+                if not -2 ** 63 <= column['min'] <= column['max'] <= 2 ** 63 - 1:
+                    print("Column {} must have bounds between -2**63 and 2**63-1 with min no larger than max.\nClosed.".format(name))
+                    exit()
+                valid = True
+            elif column['type'] == 'float':
+                # Bounds of the random floats.
+                column['min'] = float(options.pop('min'))
+                column['max'] = float(options.pop('max'))
+                valid = column['min'] < column['max']
+            else:
+                # Bounds of the random timestamps as YYYY-MM-DD or YYYY-MM-DD HH:MM:SS, the end isn't included.
+                column['start'] = datetime.datetime.fromisoformat(options.pop('start'))
+                column['seconds'] = int((datetime.datetime.fromisoformat(options.pop('end')) - column['start']).total_seconds())
+                valid = column['seconds'] > 0
+        except (KeyError, ValueError):
+            print("Column {} is missing a bound or has one that isn't valid.\nClosed.".format(name))
+            exit()
 
-        elif check_bool[0] == True and check_bool[1] == False and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randStr, theGeom) VALUES ('{}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+        if not valid or not 0 <= column['nulls'] <= 1 or len(options) > 0:
+            print("Column {} has bounds or options that aren't valid.\nClosed.".format(name))
+            exit()
+        columns.append(column)
 
-        elif check_bool[0] == False and check_bool[1] == True and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randInt, theGeom) VALUES ({}, ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_int, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+    # Return the list of columns.
+    return columns
 
-        elif check_bool[0] == False and check_bool[1] == False and check_bool[2] == True:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (randTime, theGeom) VALUES ('{} {}', ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_date, random_timestamp, pointLongitude, pointLatitude)
-            # Write query string to SQL file.
-            sqlFile.write(queryStr)
+# Takes in the parsed .ini file and builds the list of columns from the [addColumn] and [colVals] sections.
+def legacyColumns(parser):
+
+    # Search for section 'addColumn' in .ini file.
+    if parser.has_section('addColumn'):
+        # Store elements of 'addColumn' in addColumns.
+        addColumns = parser.items('addColumn')
+    else:
+        print("No [addColumn] section in .ini file.\nClosed.")
+        exit()
+
+    # Acquire the bounds of the columns from [colVals].
+    bounds = getColumnBounds(parser)
+
+    # Add each of randStr, randInt and randTime if it is 'yes' in the .ini file.
+    columns = []
+    if addColumns[0][1] == "yes":
+        columns.append({'name': 'randStr', 'type': 'text', 'nulls': 0.0, 'length': bounds['strLen']})
+    if addColumns[1][1] == "yes":
+        columns.append({'name': 'randInt', 'type': 'int', 'nulls': 0.0, 'min': bounds['intStart'], 'max': bounds['intEnd']})
+    if addColumns[2][1] == "yes":
+        columns.append({'name': 'randTime', 'type': 'timestamp', 'nulls': 0.0, 'start': bounds['start'], 'seconds': int((bounds['end'] - bounds['start']).total_seconds())})
+
+    # Return the list of columns.
+    return columns
+
+# Returns the CREATE TABLE statement for the table with a pkid, the given columns and the geometry, UNLOGGED if asked for.
+def createTableSql(TABLE_NAME, columns, unlogged=False):
+
+    definitions = ["pkid SERIAL PRIMARY KEY NOT NULL"]
+    for column in columns:
+        sqlType = COLUMN_TYPES[column['type']]
+        # Use a BIGINT if the bounds don't fit in an INT.
+        if column['type'] == 'int' and (column['min'] < -2 ** 31 or column['max'] >= 2 ** 31):
+            sqlType = 'BIGINT'
+        definitions.append("{} {}".format(column['name'], sqlType))
+    definitions.append("thegeom GEOMETRY DEFAULT ST_GeomFromText('POINT(-6.7 54)',4326)")
+
+    # An UNLOGGED table skips the write ahead log while it is being loaded.
+    return "CREATE {}TABLE {} ({}); \n".format("UNLOGGED " if unlogged else "", TABLE_NAME, ", ".join(definitions))
+
+# Iterator takes in points to be commited, database cursor, database, the name of the table, its columns and the load options.
+def pointIterDb(generated_points, cur, con, TABLE_NAME, columns, load):
+
+    # Stream the rows with COPY if chosen in the .ini file.
+    if load['method'] == 'copy':
+        copyIterDb(generated_points, cur, con, TABLE_NAME, columns)
+        return
+    # Send the rows in multi-row INSERT statements if chosen in the .ini file.
+    if load['method'] == 'batch':
+        batchIterDb(generated_points, cur, con, TABLE_NAME, columns, load)
+        return
+
+    # Compile the columns into the encoder for INSERT statements once.
+    encoder = compileRowEncoder(TABLE_NAME, columns)
+
+    # Iterate through every block as it is generated and every INSERT statement in it.
+    for block in generated_points:
+        for queryStr in encodeRows(encoder, block):
+            # Execute query string to database
+            try:
+                cur.execute(queryStr)
+            except Exception:
+                print("Table columns have changed.\nClosed.")
+                exit()
+            # Commit changes to database
+            con.commit()
+
+# Streams every generated block into the table with COPY ... FROM STDIN, sending the points as hex EWKB.
+def copyIterDb(generated_points, cur, con, TABLE_NAME, columns):
+
+    # Compile the columns into the encoder for COPY rows once.
+    encoder = compileRowEncoder(TABLE_NAME, columns, 'copy')
+
+    # Send each block as one COPY so only one block of rows is held in memory.
+    for block in generated_points:
+        try:
+            cur.copy_expert(encoder['statement'], io.StringIO("".join(encodeRows(encoder, block))))
+        except Exception:
+            print("Table columns have changed.\nClosed.")
+            exit()
+        # Commit changes to database
+        con.commit()
+
+# Sends the generated rows in INSERT statements of batchSize rows with bound parameters, committing every commitEvery rows.
+def batchIterDb(generated_points, cur, con, TABLE_NAME, columns, load):
+
+    # Compile the columns into the encoder for parameter rows once.
+    encoder = compileRowEncoder(TABLE_NAME, columns, 'params')
+
+    uncommitted = 0
+    for block in generated_points:
+        uncommitted = executeBatches(cur, con, encoder, list(encodeRows(encoder, block)), load, uncommitted)
+
+    # Commit the last rows to database.
+    con.commit()
+
+# Sends parameter rows in INSERT statements of batchSize rows, committing every commitEvery rows, and returns how many rows are still uncommitted.
+def executeBatches(cur, con, encoder, rows, load, uncommitted):
+
+    batchSize = load['batchSize']
+    for start in range(0, len(rows), batchSize):
+        batch = rows[start:start + batchSize]
+        # execute_values binds every value of the batch into one INSERT statement.
+        try:
+            psycopg2.extras.execute_values(cur, encoder['statement'], batch, template=encoder['template'], page_size=batchSize)
+        except Exception:
+            print("Table columns have changed.\nClosed.")
+            exit()
+        # Commit changes to database once enough rows are waiting.
+        uncommitted += len(batch)
+        if uncommitted >= load['commitEvery']:
+            con.commit()
+            uncommitted = 0
+    return uncommitted
+
+# Generates and encodes blocks in one thread while they are loaded in this one, then reports how long each stage was busy and idle.
+def pipelineIterDb(generated_points, cur, con, TABLE_NAME, columns, load):
+
+    # Compile the columns into the encoder for the load method once.
+    encoder = compileRowEncoder(TABLE_NAME, columns, {'insert': 'insert', 'copy': 'copy', 'batch': 'params'}[load['method']])
+
+    # The queue holds at most queueSize encoded blocks, so generation waits whenever loading falls behind.
+    batchQueue = queue.Queue(load['queueSize'])
+    stats = {'generateBusy': 0.0, 'generateIdle': 0.0, 'loadBusy': 0.0, 'loadIdle': 0.0}
+    producer = threading.Thread(target=produceBatches, args=(generated_points, encoder, batchQueue, stats), daemon=True)
+    producer.start()
+
+    uncommitted = 0
+    while True:
+        # Time spent waiting for the generation stage is idle time of the load stage.
+        waitStart = time.perf_counter()
+        batch = batchQueue.get()
+        loadStart = time.perf_counter()
+        stats['loadIdle'] += loadStart - waitStart
+        if batch is None:
+            break
+        if isinstance(batch, Exception):
+            print("Generating rows failed: {}\nClosed.".format(batch))
+            exit()
 
-        elif check_bool[0] == False and check_bool[1] == False and check_bool[2] == False:
-            # Make INSERT statement for the database using the table name, the extra columns and the latitude and longitude of the point.
-            queryStr = "INSERT into {} (theGeom) VALUES (ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, pointLongitude, pointLatitude)
+        if encoder['format'] == 'copy':
+            try:
+                cur.copy_expert(encoder['statement'], io.StringIO(batch))
+            except Exception:
+                print("Table columns have changed.\nClosed.")
+                exit()
+            # Commit changes to database
+            con.commit()
+        elif encoder['format'] == 'params':
+            uncommitted = executeBatches(cur, con, encoder, batch, load, uncommitted)
+        else:
+            for queryStr in batch:
+                # Execute query string to database
+                try:
+                    cur.execute(queryStr)
+                except Exception:
+                    print("Table columns have changed.\nClosed.")
+                    exit()
+                # Commit changes to database
+                con.commit()
+        stats['loadBusy'] += time.perf_counter() - loadStart
+
+    # Commit the last rows to database.
+    con.commit()
+    producer.join()
+
+    # The stage that is idle the least is the one holding the other back.
+    print("Generation stage: busy {:.2f} seconds, idle {:.2f} seconds waiting for room in the queue.".format(stats['generateBusy'], stats['generateIdle']))
+    print("Load stage: busy {:.2f} seconds, idle {:.2f} seconds waiting for rows.".format(stats['loadBusy'], stats['loadIdle']))
+    print("Bottleneck: {} stage.".format("generation" if stats['generateIdle'] < stats['loadIdle'] else "load"))
+
+# Generates and encodes every block and puts it in the queue, then puts None, or the exception if generating fails.
+def produceBatches(generated_points, encoder, batchQueue, stats):
+
+    try:
+        blocks = iter(generated_points)
+        while True:
+            busyStart = time.perf_counter()
+            block = next(blocks, None)
+            if block is None:
+                break
+            # COPY rows are joined into one string, statements and parameter rows are kept as lists.
+            if encoder['format'] == 'copy':
+                batch = "".join(encodeRows(encoder, block))
+            else:
+                batch = list(encodeRows(encoder, block))
+            # Time spent waiting for room in the queue is idle time of the generation stage.
+            waitStart = time.perf_counter()
+            stats['generateBusy'] += waitStart - busyStart
+            batchQueue.put(batch)
+            stats['generateIdle'] += time.perf_counter() - waitStart
+    except Exception as error:
+        batchQueue.put(error)
+        return
+    batchQueue.put(None)
+
+# Generates every row on the server in one statement, sending only the polygon as WKB.
+def serverIterDb(poly, cur, con, TABLE_NAME, columns, NUMBER_ROWS, generation):
+
+    if NUMBER_ROWS == 0:
+        return
+
+    # ST_GeneratePoints needs a valid (multi)polygon, the union covers the same area the client side sampler does.
+    boundary = shapely.to_wkb(shapely.union_all(shapely.get_parts(poly)))
+
+    # Build the expression of every column with its bounds as parameters.
+    expressions = []
+    params = []
+    for column in columns:
+        expression, expressionParams = serverColumnSql(column)
+        expressions.append(expression)
+        params.extend(expressionParams)
+
+    # Points are generated blockSize at a time so the server never builds one huge MultiPoint, a seed makes each block repeatable.
+    blockSize = generation['blockSize']
+    seedSql = ", %s + chunk" if generation['seed'] is not None else ""
+    names = [column['name'] for column in columns] + ['theGeom']
+    statement = ("INSERT into {} ({}) "
+                 "SELECT {}p.geom "
+                 "FROM (SELECT ST_SetSRID(ST_GeomFromWKB(%s), 4326) AS geom) AS boundary "
+                 "CROSS JOIN generate_series(0, %s) AS chunk "
+                 "CROSS JOIN LATERAL ST_Dump(ST_GeneratePoints(boundary.geom, LEAST(%s, %s - chunk * %s)::int{})) AS p").format(
+        TABLE_NAME, ", ".join(names), "".join(expression + ", " for expression in expressions), seedSql)
+    params = params + [psycopg2.Binary(boundary), (NUMBER_ROWS - 1) // blockSize, blockSize, NUMBER_ROWS, blockSize]
+    if generation['seed'] is not None:
+        # ST_GeneratePoints needs a seed above 0.
+        params.append(generation['seed'] + 1)
+        # Seed random() for the columns too, hashing the seed over the whole range from -1 to 1 that setseed takes.
+        digest = int.from_bytes(hashlib.sha256(str(generation['seed']).encode()).digest()[:8], 'big')
+        cur.execute("SELECT setseed(%s)", (digest / 2 ** 63 - 1,))
+
+    try:
+        cur.execute(statement, params)
+    except Exception as error:
+        print("Server side generation failed: {}\nClosed.".format(error))
+        exit()
+    # Commit changes to database
+    con.commit()
+
+# Returns the SQL expression that generates a column on the server and its parameters.
+def serverColumnSql(column):
+
+    if column['type'] == 'text':
+        # Pick every character of the string from the letters and digits.
+        character = "substr('{}', 1 + floor(random() * {})::int, 1)".format(TEXT_ALPHABET, len(TEXT_ALPHABET))
+        expression = " || ".join([character] * column['length'])
+        params = []
+    elif column['type'] == 'int':
+        expression = "(%s + floor(random() * %s))::bigint"
+        params = [column['min'], column['max'] - column['min'] + 1]
+    elif column['type'] == 'float':
+        expression = "(%s + random() * %s)"
+        params = [column['min'], column['max'] - column['min']]
+    else:
+        expression = "(%s::timestamp + floor(random() * %s) * interval '1 second')"
+        params = [column['start'], column['seconds']]
+
+    # Make the column NULL as often as asked for.
+    if column['nulls'] > 0:
+        expression = "CASE WHEN random() < %s THEN NULL ELSE {} END".format(expression)
+        params = [column['nulls']] + params
+    return expression, params
+
+# Loads the same number of rows generated in Python into a temporary table with COPY and compares it to the server load.
+def benchmarkClientLoad(generated_points, cur, con, columns, NUMBER_ROWS, serverSeconds):
+
+    # The temporary table is dropped at the end and never touches the real table's pkids.
+    cur.execute(createTableSql("pg_temp.client_benchmark", columns))
+    con.commit()
+    start = time.perf_counter()
+    copyIterDb(generated_points, cur, con, "pg_temp.client_benchmark", columns)
+    clientSeconds = time.perf_counter() - start
+    cur.execute("DROP TABLE pg_temp.client_benchmark")
+    con.commit()
+
+    print("Server side generation: {:.2f} seconds, {:.0f} rows/sec.".format(serverSeconds, NUMBER_ROWS / max(serverSeconds, 1e-9)))
+    print("Client side generation with COPY: {:.2f} seconds, {:.0f} rows/sec.".format(clientSeconds, NUMBER_ROWS / max(clientSeconds, 1e-9)))
+
+# Loads the generated blocks over several database connections at once, giving every row a pkid from a range reserved up front.
+def parallelIterDb(generated_points, cur, con, params, TABLE_NAME, columns, load, NUMBER_ROWS):
+
+    # Reserve NUMBER_ROWS values of the pkid sequence so the rows get contiguous pkids in the order they were generated.
+    # The table is locked against other inserts and the range is taken in one statement, so no other session gets a pkid inside it.
+    reserved = max(NUMBER_ROWS, 1)
+    cur.execute("LOCK TABLE {} IN EXCLUSIVE MODE".format(TABLE_NAME))
+    cur.execute("SELECT setval(pg_get_serial_sequence(%s, 'pkid'), nextval(pg_get_serial_sequence(%s, 'pkid')) + %s)", (TABLE_NAME, TABLE_NAME, reserved - 1))
+    firstPkid = cur.fetchone()[0] - reserved + 1
+    con.commit()
+
+    # Compile the columns into the encoder once, with the pkid as the first column.
+    encoder = compileRowEncoder(TABLE_NAME, columns, 'copy' if load['method'] == 'copy' else 'params', pkid=True)
+
+    # Every worker takes blocks from the queue, only a couple of blocks per connection wait so memory stays bounded.
+    blockQueue = queue.Queue(2 * load['connections'])
+    results = []
+    # Set if generating the blocks or any connection fails, so every worker rolls back instead of committing.
+    aborted = threading.Event()
+    # No worker commits until every worker has loaded its last block and knows whether any of them failed.
+    loaded = threading.Barrier(load['connections'])
+    workers = [threading.Thread(target=loadWorker, args=(params, encoder, load, blockQueue, results, aborted, loaded)) for _ in range(load['connections'])]
+    for worker in workers:
+        worker.start()
+
+    # Give each block the pkids of its rows, the blocks are disjoint ranges of the reserved pkids.
+    nextPkid = firstPkid
+    try:
+        for block in generated_points:
+            # Stop generating once a connection has failed, every worker is rolling back.
+            if aborted.is_set():
+                break
+            blockQueue.put((nextPkid, block))
+            nextPkid += len(block[0])
+    except BaseException:
+        aborted.set()
+        raise
+    finally:
+        # Tell every worker there are no blocks left and wait for them to commit, or roll back if generating failed.
+        for _ in workers:
+            blockQueue.put(None)
+        for worker in workers:
+            worker.join()
+
+    errors = [error for rows, error in results if error is not None]
+    if len(errors) > 0:
+        print("{} of {} connections failed, every connection rolled back and no rows were committed: {}\nClosed.".format(
+            len(errors), len(workers), errors[0]))
+        exit()
+    print("Loaded pkids {} to {} over {} connections.".format(firstPkid, nextPkid - 1, len(workers)))
+
+# Opens its own database connection and loads blocks from the queue in one transaction until it gets None.
+# Once every worker reaches the loaded barrier it commits, or rolls back if any worker failed and set aborted.
+def loadWorker(params, encoder, load, blockQueue, results, aborted, loaded):
+
+    con = None
+    error = None
+    rows = 0
+    try:
+        con = psycopg2.connect(**params)
+        cur = con.cursor()
+    except Exception as connectError:
+        error = connectError
+        aborted.set()
+
+    while True:
+        item = blockQueue.get()
+        if item is None:
+            break
+        # Keep taking blocks after any worker fails so the generator is never left waiting on a full queue.
+        if aborted.is_set():
+            continue
+        firstPkid, block = item
+        try:
+            if encoder['format'] == 'copy':
+                cur.copy_expert(encoder['statement'], io.StringIO("".join(encodeRows(encoder, block, firstPkid))))
+            else:
+                psycopg2.extras.execute_values(cur, encoder['statement'], list(encodeRows(encoder, block, firstPkid)), template=encoder['template'], page_size=load['batchSize'])
+            rows += len(block[0])
+        except Exception as loadError:
+            error = loadError
+            aborted.set()
+
+    # Commit the worker's transaction, or roll it back if any worker failed.
+    loaded.wait()
+    if con is not None:
+        try:
+            if error is None and not aborted.is_set():
+                con.commit()
+            else:
+                con.rollback()
+        except Exception as commitError:
+            error = commitError
+        con.close()
+    results.append((rows, error))
+
+# Iterates through the generated blocks and writes an INSERT statement for every row to the SQL file.
+def pointIterSql(generated_points, sqlFile, TABLE_NAME, columns):
+
+    # Compile the columns into the encoder for INSERT statements once.
+    encoder = compileRowEncoder(TABLE_NAME, columns)
+
+    # Iterate through every block as it is generated and every INSERT statement in it.
+    for block in generated_points:
+        for queryStr in encodeRows(encoder, block):
             # Write query string to SQL file.
             sqlFile.write(queryStr)
 
+# Writes every generated block to the SQL file as the rows of one COPY ... FROM stdin block with hex EWKB points.
+def copyIterSql(generated_points, sqlFile, TABLE_NAME, columns):
+
+    # Compile the columns into the encoder for COPY rows once.
+    encoder = compileRowEncoder(TABLE_NAME, columns, 'copy')
+
+    # psql reads the rows after the COPY statement until the line \.
+    sqlFile.write(encoder['statement'] + ";\n")
+    for block in generated_points:
+        sqlFile.write("".join(encodeRows(encoder, block)))
+    sqlFile.write("\\.\n")
+
+# Writes the generated rows to the SQL file in INSERT statements of rowsPerInsert rows, with BEGIN and COMMIT every commitEvery rows.
+def multiIterSql(generated_points, sqlFile, TABLE_NAME, columns, output):
+
+    # Compile the columns into the encoder for rows of VALUES once.
+    encoder = compileRowEncoder(TABLE_NAME, columns, 'values')
+    rowsPerInsert = output['rowsPerInsert']
+    commitEvery = output['commitEvery']
+
+    if commitEvery > 0:
+        sqlFile.write("BEGIN;\n")
+    statement = []
+    uncommitted = 0
+    for block in generated_points:
+        for row in encodeRows(encoder, block):
+            statement.append(row)
+            if len(statement) < rowsPerInsert:
+                continue
+            # Write the full statement, committing once enough rows are waiting.
+            sqlFile.write(encoder['statement'] + ",\n".join(statement) + ";\n")
+            uncommitted += len(statement)
+            statement = []
+            if commitEvery > 0 and uncommitted >= commitEvery:
+                sqlFile.write("COMMIT;\nBEGIN;\n")
+                uncommitted = 0
+
+    # Write the last rows and commit them.
+    if len(statement) > 0:
+        sqlFile.write(encoder['statement'] + ",\n".join(statement) + ";\n")
+    if commitEvery > 0:
+        sqlFile.write("COMMIT;\n")
+
+# Compiles the columns into an encoder that turns blocks of rows into INSERT statements, rows of VALUES, COPY rows or parameter rows for the table.
+def compileRowEncoder(TABLE_NAME, columns, format='insert', pkid=False):
+
+    # The pkid is only written when the loader gives out pkids itself.
+    names = (['pkid'] if pkid else []) + [column['name'] for column in columns] + ['theGeom']
+    encoder = {}
+    encoder['format'] = format
+    encoder['columns'] = columns
+    encoder['pkid'] = pkid
+    if format == 'insert':
+        # Build the statement once with a placeholder for every column and the point.
+        placeholders = "%s, " * (len(names) - 1)
+        encoder['template'] = "INSERT into {} ({}) VALUES ({}ST_SetSRID(ST_MakePoint(%s,%s),4326)); \r".format(TABLE_NAME, ", ".join(names), placeholders)
+    elif format == 'values':
+        # Rows of VALUES are joined into one INSERT statement.
+        placeholders = "%s, " * (len(names) - 1)
+        encoder['statement'] = "INSERT into {} ({}) VALUES\n".format(TABLE_NAME, ", ".join(names))
+        encoder['template'] = "({}ST_SetSRID(ST_MakePoint(%s,%s),4326))".format(placeholders)
+    elif format == 'params':
+        # Parameter rows are bound into a multi-row INSERT, the point is bound as hex EWKB.
+        encoder['statement'] = "INSERT into {} ({}) VALUES %s".format(TABLE_NAME, ", ".join(names))
+        encoder['template'] = "(" + "%s, " * (len(names) - 1) + "%s::geometry)"
+    else:
+        # COPY rows are the values separated by tabs, ending with the point as hex EWKB.
+        encoder['statement'] = "COPY {} ({}) FROM STDIN".format(TABLE_NAME, ", ".join(names))
+        encoder['template'] = "\t".join(["%s"] * len(names)) + "\n"
+    return encoder
+
+# Takes in a compiled encoder, a block of rows and the pkid of its first row if the encoder writes pkids and yields the statement, COPY row or parameter row for each row.
+def encodeRows(encoder, block, firstPkid=None):
+
+    xs, ys, values = block
+    # Turn every column of the block into SQL literals at once.
+    literals = [columnLiterals(column, columnValues, nulls, encoder['format']) for column, (columnValues, nulls) in zip(encoder['columns'], values)]
+    if encoder['pkid']:
+        literals.insert(0, range(firstPkid, firstPkid + len(xs)))
+    template = encoder['template']
+    if encoder['format'] in ('insert', 'values'):
+        for row in zip(*literals, xs.tolist(), ys.tolist()):
+            yield template % row
+    elif encoder['format'] == 'params':
+        yield from zip(*literals, pointsEwkb(xs, ys))
+    else:
+        for row in zip(*literals, pointsEwkb(xs, ys)):
+            yield template % row
+
+# Returns the points as a list of hex EWKB strings with SRID 4326.
+def pointsEwkb(xs, ys):
+
+    points = shapely.set_srid(shapely.points(xs, ys), 4326)
+    return shapely.to_wkb(points, hex=True, include_srid=True).tolist()
+
+# Returns a list of SQL literals, COPY fields or parameters for a column of values, with NULL where the null mask is set.
+def columnLiterals(column, values, nulls, format='insert'):
+
+    # Parameters are the Python values themselves, psycopg2 quotes them and sends None as NULL.
+    if format == 'params':
+        literals = values.tolist()
+        if nulls is not None:
+            for row in np.flatnonzero(nulls).tolist():
+                literals[row] = None
+        return literals
+
+    # COPY fields aren't quoted and a NULL is written as \N.
+    quote = "'" if format != 'copy' else ""
+    null = "NULL" if format != 'copy' else "\\N"
+
+    if column['type'] == 'text':
+        literals = [quote + value + quote for value in values.tolist()]
+    elif column['type'] == 'timestamp':
+        # Format the whole column of timestamps as YYYY-MM-DD HH:MM:SS at once.
+        literals = [quote + value + quote for value in np.char.replace(np.datetime_as_string(values, unit='s'), 'T', ' ').tolist()]
+    else:
+        literals = [repr(value) for value in values.tolist()]
+
+    if nulls is not None:
+        for row in np.flatnonzero(nulls).tolist():
+            literals[row] = null
+    return literals
+
 # Generates random points throughout the submitted polygon and returns them.
-def random_points_within(poly, num_points):
+def random_points_within(poly, num_points, rng=None):
     # Acquire shape bounds from poly.
     min_x, min_y, max_x, max_y = poly.bounds
+    # Draw from the block's seeded generator if there is one, so a seeded run can be repeated.
+    uniform = rng.uniform if rng is not None else random.uniform
 
     # Make list to hold all points.
     points = []
@@ -679,7 +1900,7 @@ def random_points_within(poly, num_points):
 
         # Generate random point using random.uniform.
         random_point = Point(
-            [random.uniform(min_x, max_x), random.uniform(min_y, max_y)])
+            [uniform(min_x, max_x), uniform(min_y, max_y)])
 
         # Append the points if within polygon.
         if (random_point.within(poly)):  
@@ -687,142 +1908,650 @@ def random_points_within(poly, num_points):
 
     return points
 
-# Takes in the name of the .ini file and finds out which columns are to be added.
-def addColumnsSql(fileName, sqlFile):
+# Builds everything the chosen sampler needs from the polygon once so it can be reused for every batch.
+def prepareSampler(poly, sampling, cached=None):
 
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
-    tableName = getTableName(fileName)
-
-    # Create lists to store .ini file values.
-    check = {}
-    values = {}
-    # Search for section 'addColumn' in .ini file.
-    if parser.has_section('addColumn'):
-        # Store elements of 'addColumn' in columns.
-        columns = parser.items('addColumn')
-    else:
-        print("No [addColumn] section in .ini file.\nClosed.")
-        exit()
-    
-    # Search .ini file for section colVals. 
-    if parser.has_section('colVals'):
-        # Store elements of 'colVals' in bounds.
-        bounds = parser.items('colVals')
-    else:
-        print("No [colVals] section in .ini file.\nClosed.")
+    # Store the polygon, its bounds and the sampling options in the sampler dictionary.
+    sampler = {}
+    sampler['method'] = sampling['method']
+    sampler['batchSize'] = sampling['batchSize']
+    sampler['poly'] = poly
+    sampler['bounds'] = poly.bounds
+    # Expected fraction of candidates from the bounds that land within the polygon.
+    min_x, min_y, max_x, max_y = poly.bounds
+    sampler['acceptance'] = poly.area / ((max_x - min_x) * (max_y - min_y))
+    # Count the candidates drawn and accepted so the real acceptance rate can be printed.
+    sampler['drawn'] = 0
+    sampler['accepted'] = 0
+
+    if sampling['method'] == 'strtree':
+        # Split the collection into single polygons so each one gets a tight envelope.
+        parts = shapely.get_parts(shapely.get_parts(poly))
+        # Prepare every part once so the point in polygon tests can reuse it.
+        shapely.prepare(parts)
+        sampler['parts'] = parts
+        # Put the parts in an STRtree so each point is only tested against the parts whose envelopes contain it.
+        sampler['tree'] = shapely.STRtree(parts)
+
+    elif sampling['method'] == 'triangulate' and cached is not None:
+        # Reuse the triangles from the cache.
+        sampler.update(cached)
+
+    elif sampling['method'] == 'triangulate':
+        # Split the collection into single polygons and cut each one into triangles that exactly cover it.
+        parts = shapely.get_parts(shapely.get_parts(poly))
+        triangles = shapely.get_parts(shapely.constrained_delaunay_triangles(parts))
+        # Store the three corners of every triangle, each triangle ring has its first corner repeated at the end.
+        sampler['corners'] = shapely.get_coordinates(triangles).reshape(-1, 4, 2)[:, :3]
+        # Store the running total of the triangle areas so triangles can be picked weighted by area.
+        sampler['cumulativeArea'] = np.cumsum(shapely.area(triangles))
+
+    elif sampling['method'] == 'grid' and cached is not None:
+        # Reuse the index from the cache.
+        sampler.update(cached)
+        sampler['exactTests'] = 0
+
+    elif sampling['method'] == 'grid':
+        # Split the bounds into gridSize by gridSize cells.
+        size = sampling['gridSize']
+        edgesX = np.linspace(min_x, max_x, size + 1)
+        edgesY = np.linspace(min_y, max_y, size + 1)
+        cellX, cellY = np.meshgrid(np.arange(size), np.arange(size))
+        cellX = cellX.ravel()
+        cellY = cellY.ravel()
+        boxes = shapely.box(edgesX[cellX], edgesY[cellY], edgesX[cellX + 1], edgesY[cellY + 1])
+
+        # Cells whose box doesn't touch a boundary are entirely interior or exterior, so testing their centres is enough.
+        centreX = (edgesX[cellX] + edgesX[cellX + 1]) / 2
+        centreY = (edgesY[cellY] + edgesY[cellY + 1]) / 2
+        cells = np.where(shapely.contains_xy(poly, centreX, centreY), GRID_INTERIOR, GRID_EXTERIOR).astype(np.uint8)
+
+        # Mark every cell crossed by the boundary of any part, using an STRtree of the cells to find them.
+        boundaries = shapely.boundary(shapely.get_parts(shapely.get_parts(poly)))
+        crossed = shapely.STRtree(boxes).query(boundaries, predicate='intersects')[1]
+        cells[crossed] = GRID_BOUNDARY
+
+        # Store the index as rows of y by columns of x with the size of a cell.
+        sampler['cells'] = cells.reshape(size, size)
+        sampler['cellSize'] = ((max_x - min_x) / size, (max_y - min_y) / size)
+        sampler['exactTests'] = 0
+
+    elif sampling['method'] == 'stratified':
+        # Keep every feature with an area, points are split between them by area.
+        features = shapely.get_parts(poly)
+        features = features[shapely.area(features) > 0]
+        sampler['featureAreas'] = shapely.area(features)
+        sampler['featureCounts'] = np.zeros(len(features), dtype=np.int64)
+        # Each feature gets its own vectorized sampler so candidates are drawn from the feature's own bounds.
+        sampler['features'] = []
+        for feature in features:
+            shapely.prepare(feature)
+            sampler['features'].append(prepareSampler(feature, {'method': 'vectorized', 'batchSize': sampling['batchSize']}))
+
+    return sampler
+
+# Tests arrays of coordinates against the sampler's polygon and returns a boolean array of which are within it.
+def pointsWithin(sampler, xs, ys):
+
+    if sampler['method'] == 'strtree':
+        # Find the parts whose envelopes contain each point.
+        pointIdx, partIdx = sampler['tree'].query(shapely.points(xs, ys))
+        # Only test each point against those parts.
+        inside = shapely.contains_xy(sampler['parts'][partIdx], xs[pointIdx], ys[pointIdx])
+        within = np.zeros(len(xs), dtype=bool)
+        within[pointIdx[inside]] = True
+        return within
+
+    elif sampler['method'] == 'grid':
+        # Find the cell of every point.
+        size = len(sampler['cells'])
+        cellX = np.clip(((xs - sampler['bounds'][0]) / sampler['cellSize'][0]).astype(np.intp), 0, size - 1)
+        cellY = np.clip(((ys - sampler['bounds'][1]) / sampler['cellSize'][1]).astype(np.intp), 0, size - 1)
+        state = sampler['cells'][cellY, cellX]
+        # Accept interior cells and reject exterior cells straight from the index.
+        within = state == GRID_INTERIOR
+        # Only points in boundary cells need the exact test.
+        check = state == GRID_BOUNDARY
+        within[check] = shapely.contains_xy(sampler['poly'], xs[check], ys[check])
+        sampler['exactTests'] += int(check.sum())
+        return within
+
+    # Test the whole array against the polygon in one call.
+    return shapely.contains_xy(sampler['poly'], xs, ys)
+
+# Generates random points throughout the sampler's polygon in batches and returns their coordinates as arrays.
+def random_points_within_vectorized(sampler, num_points, rng=None):
+
+    # Use a new random generator if one isn't given.
+    if rng is None:
+        rng = np.random.default_rng()
+    # Acquire shape bounds from sampler.
+    min_x, min_y, max_x, max_y = sampler['bounds']
+
+    # Make arrays to hold all accepted coordinates.
+    xs = np.empty(num_points)
+    ys = np.empty(num_points)
+    found = 0
+
+    # While there are points still to be found, draw a batch of candidates and keep the ones within the polygon.
+    while found < num_points:
+
+        # Draw enough candidates to fill the remaining points, no more than batchSize at a time.
+        draws = min(sampler['batchSize'], int((num_points - found) / sampler['acceptance'] * 1.1) + 16)
+        # Generate a batch of random coordinates using rng.uniform.
+        cand_x = rng.uniform(min_x, max_x, draws)
+        cand_y = rng.uniform(min_y, max_y, draws)
+
+        # Test the whole batch against the polygon.
+        inside = pointsWithin(sampler, cand_x, cand_y)
+        hits = min(int(inside.sum()), num_points - found)
+
+        # Append the points within the polygon.
+        xs[found:found + hits] = cand_x[inside][:hits]
+        ys[found:found + hits] = cand_y[inside][:hits]
+        found += hits
+
+        # Count the candidates for the acceptance rate.
+        sampler['drawn'] += draws
+        sampler['accepted'] += int(inside.sum())
+
+    return xs, ys
+
+# Splits the points between the sampler's features by area and samples each feature within its own bounds.
+def random_points_within_stratified(sampler, num_points, rng=None):
+
+    # Use a new random generator if one isn't given.
+    if rng is None:
+        rng = np.random.default_rng()
+    areas = sampler['featureAreas']
+
+    # Split the points between the features with a multinomial draw weighted by area.
+    counts = rng.multinomial(num_points, areas / areas.sum())
+    sampler['featureCounts'] += counts
+
+    # Make arrays to hold all coordinates.
+    xs = np.empty(num_points)
+    ys = np.empty(num_points)
+    found = 0
+
+    # Sample each feature's share of the points with its own sampler.
+    for feature, count in zip(sampler['features'], counts.tolist()):
+        if count > 0:
+            xs[found:found + count], ys[found:found + count] = random_points_within_vectorized(feature, count, rng)
+            found += count
+
+    # Shuffle the points so rows aren't grouped by feature.
+    order = rng.permutation(num_points)
+    return xs[order], ys[order]
+
+# Generates random points throughout the sampler's triangles without rejection and returns their coordinates as arrays.
+def random_points_within_triangles(sampler, num_points, rng=None):
+
+    # Use a new random generator if one isn't given.
+    if rng is None:
+        rng = np.random.default_rng()
+    cumulativeArea = sampler['cumulativeArea']
+
+    # Pick a triangle for every point weighted by its area.
+    picked = np.searchsorted(cumulativeArea, rng.uniform(0, cumulativeArea[-1], num_points), side='right')
+    # Guard against the draw landing exactly on the total area.
+    picked = np.minimum(picked, len(cumulativeArea) - 1)
+    corners = sampler['corners'][picked]
+
+    # Draw two random weights per point and fold those outside the triangle back into it.
+    u = rng.random(num_points)
+    v = rng.random(num_points)
+    outside = u + v > 1
+    u[outside] = 1 - u[outside]
+    v[outside] = 1 - v[outside]
+
+    # Place each point at its weights along the two edges from the first corner.
+    first = corners[:, 0]
+    points = first + u[:, None] * (corners[:, 1] - first) + v[:, None] * (corners[:, 2] - first)
+
+    return points[:, 0].copy(), points[:, 1].copy()
+
+# Generates num_points points with the prepared sampler and returns their coordinates as arrays.
+def samplePoints(sampler, num_points, rng=None):
+
+    if sampler['method'] == 'loop':
+        # Use the original sampler and move the coordinates of each point into arrays.
+        points = random_points_within(sampler['poly'], num_points, rng)
+        return np.array([aPoint.x for aPoint in points]), np.array([aPoint.y for aPoint in points])
+
+    elif sampler['method'] == 'triangulate':
+        return random_points_within_triangles(sampler, num_points, rng)
+
+    elif sampler['method'] == 'stratified':
+        return random_points_within_stratified(sampler, num_points, rng)
+
+    return random_points_within_vectorized(sampler, num_points, rng)
+
+# Times the chosen sampler against the original one point at a time sampler and prints the speedup.
+def benchmarkSampler(sampler, num_points, prepTime):
+
+    # Time the original sampler on the unprepared polygon.
+    start = time.perf_counter()
+    random_points_within(sampler['poly'], num_points)
+    loopTime = time.perf_counter() - start
+
+    # Time the chosen sampler on the same number of points.
+    start = time.perf_counter()
+    samplePoints(sampler, num_points)
+    samplerTime = time.perf_counter() - start
+
+    print("Benchmark over {} points:".format(num_points))
+    print("  loop: {:.3f}s ({:.0f} points/s)".format(loopTime, num_points / loopTime))
+    print("  {}: {:.3f}s ({:.0f} points/s) plus {:.3f}s preparing".format(sampler['method'], samplerTime, num_points / samplerTime, prepTime))
+    print("  speedup: {:.1f}x".format(loopTime / samplerTime))
+
+    # Also time the plain vectorized sampler so the gain of the index itself can be seen.
+    if sampler['method'] not in ('loop', 'vectorized'):
+        vectorized = prepareSampler(sampler['poly'], {'method': 'vectorized', 'batchSize': sampler['batchSize']})
+        start = time.perf_counter()
+        samplePoints(vectorized, num_points)
+        vectorizedTime = time.perf_counter() - start
+        print("  vectorized: {:.3f}s ({:.0f} points/s)".format(vectorizedTime, num_points / vectorizedTime))
+        print("  speedup over vectorized: {:.1f}x".format(vectorizedTime / samplerTime))
+
+    # Clear the counts from the benchmark so only the real run is reported.
+    resetSamplerStats(sampler)
+
+# Sets the candidate and feature counts of the sampler back to zero.
+def resetSamplerStats(sampler):
+
+    sampler['drawn'] = 0
+    sampler['accepted'] = 0
+    if sampler['method'] == 'grid':
+        sampler['exactTests'] = 0
+    elif sampler['method'] == 'stratified':
+        sampler['featureCounts'][:] = 0
+        for feature in sampler['features']:
+            resetSamplerStats(feature)
+
+# Returns the sampler's counts since it was last reset, with everything printSamplerStats needs to report them.
+def samplerStats(sampler):
+
+    stats = {'method': sampler['method'], 'drawn': sampler['drawn'], 'accepted': sampler['accepted']}
+    if sampler['method'] == 'grid':
+        stats['exactTests'] = sampler['exactTests']
+        stats['boundary'] = float(np.mean(sampler['cells'] == GRID_BOUNDARY))
+    elif sampler['method'] == 'stratified':
+        stats['acceptance'] = sampler['acceptance']
+        stats['featureCounts'] = sampler['featureCounts'].copy()
+        stats['features'] = [samplerStats(feature) for feature in sampler['features']]
+    return stats
+
+# Adds the counts of stats to total, so the counts of every worker process can be reported together, and returns total.
+def addSamplerStats(total, stats):
+
+    if total is None:
+        return stats
+    total['drawn'] += stats['drawn']
+    total['accepted'] += stats['accepted']
+    if total['method'] == 'grid':
+        total['exactTests'] += stats['exactTests']
+    elif total['method'] == 'stratified':
+        total['featureCounts'] += stats['featureCounts']
+        for feature, featureStats in zip(total['features'], stats['features']):
+            addSamplerStats(feature, featureStats)
+    return total
+
+# Prints how many candidates the sampler accepted, and for the stratified sampler the counts for each feature, from samplerStats.
+def printSamplerStats(stats):
+
+    if stats['method'] == 'stratified':
+        drawn = 0
+        accepted = 0
+        # Print the points and acceptance rate for each feature.
+        for number, (feature, count) in enumerate(zip(stats['features'], stats['featureCounts'].tolist())):
+            if feature['drawn'] > 0:
+                print("Feature {}: {} points, acceptance rate {:.1%}.".format(number, count, feature['accepted'] / feature['drawn']))
+            drawn += feature['drawn']
+            accepted += feature['accepted']
+        if drawn > 0:
+            print("Stratified acceptance rate {:.1%}, a single bounding box would accept {:.1%}.".format(accepted / drawn, stats['acceptance']))
+
+    elif stats['drawn'] > 0:
+        print("Acceptance rate {:.1%}.".format(stats['accepted'] / stats['drawn']))
+
+    # Print how much of the grid index is boundary and how many candidates still needed the exact test.
+    if stats['method'] == 'grid' and stats['drawn'] > 0:
+        print("Grid index: {:.1%} boundary cells, {:.1%} of candidates needed the exact test.".format(
+            stats['boundary'], stats['exactTests'] / stats['drawn']))
+
+# Prepares the sampler from the settings of the run for the polygon and returns a generator of the rows in blocks.
+def generatePoints(poly, run):
+
+    # Acquire number of points, sampling, generation and column options from the run.
+    num_points = run.numPoints
+    sampling = run.sampling
+    generation = run.generation
+    columns = run.columns
+    # Split the points into blocks, each with its own random stream or range of row numbers.
+    blocks = planBlocks(num_points, generation)
+
+    # Load the slow to build parts of the sampler from the cache, or build and cache them.
+    start = time.perf_counter()
+    cached = getCachedSamplerArrays(poly, sampling, run.cache)
+
+    # Each worker prepares its own sampler, so only prepare one here if it is needed for the benchmark.
+    if generation['workers'] > 1 and sampling['benchmark'] == 0:
+        return iterBlocksParallel(poly, sampling, columns, blocks, generation['workers'], generation['source'], cached)
+
+    # Prepare the sampler once and time how long it took.
+    sampler = prepareSampler(poly, sampling, cached)
+    prepTime = time.perf_counter() - start
+
+    # Report the speedup against the original sampler if asked for in the .ini file.
+    if sampling['benchmark'] > 0:
+        benchmarkSampler(sampler, sampling['benchmark'], prepTime)
+
+    if generation['workers'] > 1:
+        return iterBlocksParallel(poly, sampling, columns, blocks, generation['workers'], generation['source'], cached)
+
+    return iterBlocks(sampler, columns, blocks, generation['source'])
+
+# Returns the first row and the row after the last one that the run generates, only rng=counter can generate part of the rows.
+def rowRange(num_points, generation):
+
+    if generation['rng'] != 'counter':
+        return 0, num_points
+
+    startRow = generation['startRow']
+    endRow = generation['endRow'] if generation['endRow'] is not None else num_points
+    if startRow < 0 or startRow > endRow or endRow > num_points:
+        print("startRow and endRow must be between 0 and numPoints with startRow first.\nClosed.")
         exit()
-    
-    values[0] = bounds[0][1]
-    values[1] = bounds[1][1]
-    values[2] = bounds[2][1]
-    values[3] = bounds[3][1]
-    values[4] = bounds[4][1]
-
-    # If randStr=yes, make the corresponding check value True else False. Then store the values for the bounds to values list.
-    if columns[0][1] == "yes":
-        check[0] = True
-    else:
-        # Drop column randStr if 'no' in .ini file.
-        sqlFile.write("ALTER TABLE {} DROP COLUMN randStr;\r".format(tableName))
-        check[0] = False
-
-    # If randInt=yes, make the corresponding check value True else False. Then store the values for the bounds to values list.
-    if columns[1][1] == "yes":
-        check[1] = True
-    else:
-        # Drop column randInt if 'no' in .ini file.
-        sqlFile.write("ALTER TABLE {} DROP COLUMN randInt;\r".format(tableName))
-        check[1] = False
-
-    # If randTime=yes, make the corresponding check value True else False. Then store the values for the bounds to values list.
-    if columns[2][1] == "yes":
-        check[2] = True
-    else:
-        # Drop column randTime if 'no' in .ini file.
-        sqlFile.write("ALTER TABLE {} DROP COLUMN randTime;\r".format(tableName))
-        check[2] = False
-    
-    # Return back lists: check and values, with the information on whether the columns are wanted and what the bounds of the columns are. 
-    return check, values
-
-# Takes in the name of the .ini file, the database sursor and the active database connection then finds out which columns are to be added.
-def addColumnsDb(fileName, cur, con):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
-    tableName = getTableName(fileName)
-    # Create lists to store .ini file values.
-    check = {}
-    values = {}
-
-    # Search for section 'addColumn' in .ini file.
-    if parser.has_section('addColumn'):
-        # Store elements of 'addColumn' in columns.
-        columns = parser.items('addColumn')
+    return startRow, endRow
+
+# Splits num_points into blocks, returning the size, seed and first row of every block in the order they are generated.
+def planBlocks(num_points, generation):
+
+    ranges = planRanges(num_points, generation)
+
+    # Every counter row only depends on the seed and its row number, so keep the blocks in row order.
+    if generation['rng'] == 'counter':
+        return [block for workerBlocks in ranges for block in workerBlocks]
+
+    # Take blocks from each worker's range in turn so all of the workers are kept busy.
+    blocks = []
+    for turn in range(max(len(workerBlocks) for workerBlocks in ranges)):
+        for workerBlocks in ranges:
+            if turn < len(workerBlocks):
+                blocks.append(workerBlocks[turn])
+
+    return blocks
+
+# Splits the run's rows into one range of about the same size per worker and each range into blocks, returning a list of blocks for every worker.
+def planRanges(num_points, generation):
+
+    workers = generation['workers']
+    blockSize = generation['blockSize']
+
+    if generation['rng'] == 'counter':
+        # Cut the requested rows into one contiguous range per worker and each range into blocks in order.
+        startRow, endRow = rowRange(num_points, generation)
+        count = endRow - startRow
+        ranges = []
+        for worker in range(workers):
+            first = startRow + count * worker // workers
+            last = startRow + count * (worker + 1) // workers
+            ranges.append([(min(blockSize, last - row), generation['seed'], row) for row in range(first, last, blockSize)])
+        return ranges
+
+    # Spawn one independent seed per worker from the master seed, with no seed every block uses fresh entropy.
+    if generation['seed'] is not None:
+        workerSeeds = np.random.SeedSequence(generation['seed']).spawn(workers)
     else:
-        print("No [addColumn] section in .ini file.\nClosed.")
-        exit()
+        workerSeeds = [None] * workers
+
+    # Make a list of blocks for every worker's range of points.
+    ranges = []
+    for worker in range(workers):
+        count = num_points * (worker + 1) // workers - num_points * worker // workers
+        sizes = [min(blockSize, count - start) for start in range(0, count, blockSize)]
+        # Spawn a seed for every block from the worker's seed so each block can be generated anywhere.
+        if workerSeeds[worker] is not None:
+            seeds = workerSeeds[worker].spawn(len(sizes))
+        else:
+            seeds = [None] * len(sizes)
+        ranges.append([(size, seed, None) for size, seed in zip(sizes, seeds)])
 
-    # Search for section 'colVals' in .ini file.
-    if parser.has_section('colVals'):
-        bounds = parser.items('colVals')
-    else:
-        print("No [colVals] section in .ini file.\nClosed.")
-        exit()
+    return ranges
 
-    # Store all of the bounds information in values list.
-    values[0] = bounds[0][1]
-    values[1] = bounds[1][1]
-    values[2] = bounds[2][1]
-    values[3] = bounds[3][1]
-    values[4] = bounds[4][1]
+# Generates the points and columns of one block and returns them as coordinate arrays and a list of column values and null masks.
+def generateBlock(sampler, columns, block, source):
 
-    # If randStr=yes, make the corresponding check value True else False. Then store the values for the bounds to values list.
-    if columns[0][1] == "yes":
-        check[0] = True
-    else:
-        check[0] = False
-        try:
-            # Drop column randStr if 'no' in .ini file.
-            cur.execute("ALTER TABLE {} DROP COLUMN randStr;\r".format(tableName))
-        except Exception:
-            print("Column randStr kept.")
-        # Commit changes to database if there are any.
-        con.commit()
+    count, seed, firstRow = block
+    if firstRow is not None:
+        # Work out the rows of the block from the master seed and their row numbers.
+        rows = np.arange(firstRow, firstRow + count, dtype=np.uint64)
+        xs, ys = counterPoints(sampler, seed, rows)
+        return xs, ys, counterColumns(seed, rows, columns)
 
-    # If randInt=yes, make the corresponding check value True else False. Then store the values for the bounds to values list.
-    if columns[1][1] == "yes":
-        check[1] = True
-    else:
-        check[1] = False
-        try:
-            # Drop column randStr if 'no' in .ini file.
-            cur.execute("ALTER TABLE {} DROP COLUMN randInt;\r".format(tableName))
-        except Exception:
-            print("Column randInt kept.")
-        # Commit changes to database if there are any.
-        con.commit()
+    # Seed the points from the block's own seed, or fresh entropy if there is no seed.
+    rng = np.random.default_rng(seed)
+    xs, ys = samplePoints(sampler, count, rng)
 
-    # If randTime=yes, make the corresponding check value True else False. Then store the values for the bounds to values list.
-    if columns[2][1] == "yes":
-        check[2] = True
+    # Draw the bytes for the attributes from the operating system or from the block's generator.
+    if source == 'crypto':
+        randomBytes = os.urandom
     else:
-        check[2] = False
-        try:
-            # Drop column randStr if 'no' in .ini file.
-            cur.execute("ALTER TABLE {} DROP COLUMN randTime;\r".format(tableName))
-        except Exception:
-            print("Column randTime kept.")
-            # Commit changes to database if there are any.
-        con.commit()
-    
-    # Return back lists: check and values, with the information on whether the columns are wanted and what the bounds of the columns are. 
-    return check, values
+        randomBytes = rng.bytes
+
+    return xs, ys, randomColumns(count, columns, randomBytes)
+
+# Returns count random integers in [0, span) built from random bytes, throwing away draws that would bias the result.
+def randomIntegers(count, span, randomBytes):
+
+    # A span above 64 bits could never be drawn from 64 bit numbers.
+    if span > 2 ** 64:
+        raise ValueError("span of random integers must be at most 2 ** 64")
+
+    # Largest multiple of span that fits in 64 bits, draws at or above it are thrown away.
+    limit = (2 ** 64 // span) * span
+    values = np.empty(0, dtype=np.uint64)
+    while len(values) < count:
+        # Draw a few extra numbers so a second round is rarely needed.
+        needed = count - len(values)
+        draws = np.frombuffer(randomBytes(8 * (needed + needed // 16 + 8)), dtype=np.uint64)
+        if limit < 2 ** 64:
+            draws = draws[draws < np.uint64(limit)]
+        values = np.concatenate((values, draws))
+
+    # Every 64 bit number is already in a span of 2 ** 64.
+    if span == 2 ** 64:
+        return values[:count].astype(np.int64)
+    return (values[:count] % np.uint64(span)).astype(np.int64)
+
+# Returns count random floats in [0, 1) built from random bytes.
+def randomFractions(count, randomBytes):
+
+    return randomIntegers(count, 2 ** 53, randomBytes) * 2.0 ** -53
+
+# Generates whole columns of values and null masks for count rows from random bytes.
+def randomColumns(count, columns, randomBytes):
+
+    values = []
+    for column in columns:
+        if column['type'] == 'text':
+            # Create random strings of the column's length, mapping random bytes onto the letters and digits.
+            alphabet = np.frombuffer(TEXT_ALPHABET.encode(), dtype=np.uint8)
+            chars = alphabet[randomIntegers(count * column['length'], len(alphabet), randomBytes)]
+            columnValues = chars.reshape(count, column['length']).view('S{}'.format(column['length'])).ravel().astype(str)
+        elif column['type'] == 'int':
+            # Create random ints within the column's bounds.
+            columnValues = column['min'] + randomIntegers(count, column['max'] - column['min'] + 1, randomBytes)
+        elif column['type'] == 'float':
+            # Create random floats within the column's bounds.
+            columnValues = column['min'] + randomFractions(count, randomBytes) * (column['max'] - column['min'])
+        else:
+            # Create random timestamps as a number of seconds after the start.
+            columnValues = np.datetime64(column['start'], 's') + randomIntegers(count, column['seconds'], randomBytes)
+
+        # Mark the rows that are NULL, if the column has any.
+        nulls = None
+        if column['nulls'] > 0:
+            nulls = randomFractions(count, randomBytes) < column['nulls']
+        values.append((columnValues, nulls))
+
+    return values
+
+# Mixes the bits of an array of unsigned 64 bit integers with the splitmix64 finaliser.
+def mix64(z):
+
+    z = (z ^ (z >> np.uint64(30))) * SPLITMIX_MUL1
+    z = (z ^ (z >> np.uint64(27))) * SPLITMIX_MUL2
+    return z ^ (z >> np.uint64(31))
+
+# Returns one uniform number in [0, 1) for every row number, depending only on the seed, the stream and the row.
+def counterUniforms(seed, rows, stream):
+
+    # Mix the seed and every part of the stream into one key.
+    key = np.array([seed], dtype=np.uint64)
+    for part in stream:
+        key = mix64((key ^ np.uint64(part)) + SPLITMIX_GAMMA)
+
+    # Hash the key with each row number and keep the top 53 bits as a double.
+    z = mix64(rows * SPLITMIX_GAMMA + key)
+    return (z >> np.uint64(11)).astype(np.float64) * 2.0 ** -53
+
+# Works out the point of every row from the seed and row numbers and returns their coordinates as arrays.
+def counterPoints(sampler, seed, rows):
+
+    if sampler['method'] == 'triangulate':
+        # Pick a triangle weighted by area, then two weights folded back into the triangle.
+        cumulativeArea = sampler['cumulativeArea']
+        picked = np.searchsorted(cumulativeArea, counterUniforms(seed, rows, (STREAM_TRIANGLE,)) * cumulativeArea[-1], side='right')
+        corners = sampler['corners'][np.minimum(picked, len(cumulativeArea) - 1)]
+        u = counterUniforms(seed, rows, (STREAM_TRIANGLE, 0))
+        v = counterUniforms(seed, rows, (STREAM_TRIANGLE, 1))
+        outside = u + v > 1
+        u[outside] = 1 - u[outside]
+        v[outside] = 1 - v[outside]
+        first = corners[:, 0]
+        points = first + u[:, None] * (corners[:, 1] - first) + v[:, None] * (corners[:, 2] - first)
+        return points[:, 0].copy(), points[:, 1].copy()
+
+    # Make arrays to hold the coordinates of every row.
+    xs = np.empty(len(rows))
+    ys = np.empty(len(rows))
+
+    if sampler['method'] == 'stratified':
+        # Pick a feature for every row weighted by area, then work out the rows of each feature with its own sampler.
+        cumulativeArea = np.cumsum(sampler['featureAreas'])
+        picked = np.searchsorted(cumulativeArea, counterUniforms(seed, rows, (STREAM_FEATURE,)) * cumulativeArea[-1], side='right')
+        picked = np.minimum(picked, len(cumulativeArea) - 1)
+        sampler['featureCounts'] += np.bincount(picked, minlength=len(cumulativeArea))
+        for number in np.unique(picked).tolist():
+            inFeature = picked == number
+            xs[inFeature], ys[inFeature] = counterPoints(sampler['features'][number], seed, rows[inFeature])
+        return xs, ys
+
+    # Acquire shape bounds from sampler.
+    min_x, min_y, max_x, max_y = sampler['bounds']
+    pending = np.arange(len(rows))
+    attempt = 0
+
+    # Every row draws its own candidates attempt by attempt until one is within the polygon.
+    while len(pending) > 0:
+        cand_x = min_x + counterUniforms(seed, rows[pending], (STREAM_POINT, attempt, 0)) * (max_x - min_x)
+        cand_y = min_y + counterUniforms(seed, rows[pending], (STREAM_POINT, attempt, 1)) * (max_y - min_y)
+        inside = pointsWithin(sampler, cand_x, cand_y)
+
+        # Count the candidates for the acceptance rate.
+        sampler['drawn'] += len(pending)
+        sampler['accepted'] += int(inside.sum())
+
+        # Keep the rows that found a point and try again for the rest.
+        xs[pending[inside]] = cand_x[inside]
+        ys[pending[inside]] = cand_y[inside]
+        pending = pending[~inside]
+        attempt += 1
+
+    return xs, ys
+
+# Works out the column values and null masks of every row from the seed and row numbers.
+def counterColumns(seed, rows, columns):
+
+    values = []
+    for number, column in enumerate(columns):
+        if column['type'] == 'text':
+            # Pick every character of the strings from its own stream.
+            alphabet = np.frombuffer(TEXT_ALPHABET.encode(), dtype=np.uint8)
+            chars = np.empty((len(rows), column['length']), dtype=np.uint8)
+            for position in range(column['length']):
+                chars[:, position] = alphabet[(counterUniforms(seed, rows, (STREAM_COLUMN, number, position)) * len(alphabet)).astype(np.intp)]
+            columnValues = chars.view('S{}'.format(column['length'])).ravel().astype(str)
+        elif column['type'] == 'int':
+            # Scale the integers to the column's bounds.
+            span = column['max'] - column['min'] + 1
+            columnValues = column['min'] + (counterUniforms(seed, rows, (STREAM_COLUMN, number)) * span).astype(np.int64)
+        elif column['type'] == 'float':
+            # Scale the floats to the column's bounds.
+            columnValues = column['min'] + counterUniforms(seed, rows, (STREAM_COLUMN, number)) * (column['max'] - column['min'])
+        else:
+            # Store the timestamps as a number of seconds after the start.
+            offsets = (counterUniforms(seed, rows, (STREAM_COLUMN, number)) * column['seconds']).astype(np.int64)
+            columnValues = np.datetime64(column['start'], 's') + offsets
+
+        # Mark the rows that are NULL, if the column has any.
+        nulls = None
+        if column['nulls'] > 0:
+            nulls = counterUniforms(seed, rows, (STREAM_NULL, number)) < column['nulls']
+        values.append((columnValues, nulls))
+
+    return values
+
+# Generates the planned blocks one after another with the prepared sampler.
+def iterBlocks(sampler, columns, blocks, source):
+
+    # Generate and yield one block at a time so memory stays the same however many points there are.
+    for block in blocks:
+        yield generateBlock(sampler, columns, block, source)
+
+    # Print the acceptance rates of the sampler once every block is done.
+    printSamplerStats(samplerStats(sampler))
+
+# Generates the planned blocks in a pool of worker processes and yields them in the planned order.
+def iterBlocksParallel(poly, sampling, columns, blocks, workers, source, cached=None):
+
+    # Every worker prepares its own sampler once when it starts.
+    with multiprocessing.Pool(workers, initializer=initWorker, initargs=(poly, sampling, columns, source, cached)) as pool:
+        pending = collections.deque()
+        # Add up the sampler counts that come back with every block.
+        total = None
+        for block in blocks:
+            pending.append(pool.apply_async(generateWorkerBlock, (block,)))
+            # Only keep a couple of blocks per worker waiting so memory stays bounded.
+            if len(pending) >= 2 * workers:
+                generated, stats = pending.popleft().get()
+                total = addSamplerStats(total, stats)
+                yield generated
+        while pending:
+            generated, stats = pending.popleft().get()
+            total = addSamplerStats(total, stats)
+            yield generated
+
+    # Print the acceptance rates of every worker's sampler together once every block is done.
+    if total is not None:
+        printSamplerStats(total)
+
+# Prepares the sampler of a worker process.
+def initWorker(poly, sampling, columns, source, cached):
+
+    global workerSampler, workerColumns, workerSource
+    workerSampler = prepareSampler(poly, sampling, cached)
+    workerColumns = columns
+    workerSource = source
+
+# Generates one block in a worker process with the worker's sampler and returns it with the sampler's counts for the block.
+def generateWorkerBlock(block):
+
+    resetSamplerStats(workerSampler)
+    generated = generateBlock(workerSampler, workerColumns, block, workerSource)
+    return generated, samplerStats(workerSampler)
 
 # Begins program. 
 if __name__ == '__main__':
@@ -1,15 +1,23 @@
 import psycopg2
+import psycopg2.extras
 import random
 from random import randint
 from random import randrange
 import datetime 
 import json
 import string
+from collections import namedtuple
 from shapely.geometry import Polygon, Point, shape, GeometryCollection
 from configparser import ConfigParser
 import tkinter as tk
 from tkinter import filedialog
 
+# Settings of one run, read once from the .ini file by loadRunConfig and passed to every function.
+RunConfig = namedtuple('RunConfig', ['fileName', 'database', 'numPoints', 'geojsonName', 'tableName', 'sqlFile', 'addColumns', 'columnMode'])
+
+# Types the extra columns are added to the table with.
+COLUMN_TYPES = {'randStr': 'VARCHAR(50)', 'randInt': 'INT', 'randTime': 'TIMESTAMP'}
+
 # Function used to create a root window to allow user to select a .ini file.
 def filePicker():
 
@@ -41,20 +49,23 @@ def filePicker():
 # Commits the points to the databse if requested by the user.
 def toDatabase(fileName):
 
-    # Acquire number of rows from file
-    NUMBER_ROWS = getNumPoints(fileName)
+    # Read and check the whole .ini file before connecting to the database.
+    run = loadRunConfig(fileName, 'database')
+
+    # Acquire number of rows from the run
+    NUMBER_ROWS = run.numPoints
     
     # Acquire polygon from file
-    poly = getPolygon(fileName)
+    poly = getPolygon(run)
     
-    # Acquire the name of the table from file
-    TABLE_NAME = getTableName(fileName)
+    # Acquire the name of the table from the run
+    TABLE_NAME = run.tableName
 
     # Use random_points_within function to generate all of the necessary points with the submitted polygon and number of points 
     generated_points = random_points_within(poly, NUMBER_ROWS)
 
-    # Receive Database parameters from config file.
-    params = config(fileName)
+    # Receive Database parameters from the run.
+    params = run.database
 
     # Connect to database using config file parameters.
     try:
@@ -120,37 +131,52 @@ def toDatabase(fileName):
     # Commit changes to the database.
     con.commit()  
 
+    # In insert mode add the extra columns first so they are filled as the rows are inserted.
+    insertColumns = []
+    if run.columnMode == 'insert':
+        insertColumns = wantedColumns(run)
+        if len(insertColumns) > 0:
+            cur.execute(addColumnsAlter(run, insertColumns))
+            con.commit()
+
     # Use iterator function to iterate through all points and commit them to the database.
-    pointIterDb(generated_points, cur, con, TABLE_NAME)
+    pointIterDb(generated_points, cur, con, TABLE_NAME, insertColumns)
     print("Successfully committed {} rows to table: {}.".format(NUMBER_ROWS, TABLE_NAME))
 
     # Call the addColumnsDb function which determines which columns are to be added. 
-    addColumnsDb(fileName, cur, con)
+    if run.columnMode == 'update':
+        addColumnsDb(run, cur, con)
+    # Or fill them all with one UPDATE from a bulk loaded staging table.
+    elif run.columnMode == 'staging':
+        fillColumnsStagingDb(run, cur, con)
 
 # Writes the points to an SQL file if requested by the user for manual commits.
 def createSql(fileName):
 
-    # Acquire number of rows from file.
-    NUMBER_ROWS = getNumPoints(fileName)
+    # Read and check the whole .ini file before generating anything.
+    run = loadRunConfig(fileName, 'sql')
+
+    # Acquire number of rows from the run.
+    NUMBER_ROWS = run.numPoints
     
     # Acquire polygon from file.
-    poly = getPolygon(fileName)
+    poly = getPolygon(run)
 
     # Use random_points_within function to generate all of the necessary points with the submitted polygon and number of points.
     generated_points = random_points_within(poly, NUMBER_ROWS)
     
-    # Acquire the name of the table from file.
-    TABLE_NAME = getTableName(fileName)
+    # Acquire the name of the table from the run.
+    TABLE_NAME = run.tableName
 
     # Opens up the sql filename given in the .ini file and writes to it.
-    sqlFile = open(getSqlFile(fileName), "w")
+    sqlFile = open(run.sqlFile, "w")
     # Writes nothing to clear file.
     sqlFile.write("")
     # Closes sql file.
     sqlFile.close()
 
     # Opens up the sql filename given in the .ini file and appends to it.
-    sqlFile = open(getSqlFile(fileName), "a")
+    sqlFile = open(run.sqlFile, "a")
     # Write to the file a DROP statement in case the table exists.
     sqlFile.write("DROP TABLE IF EXISTS {}; \n".format(TABLE_NAME))
     # Write CREATE statement to file to make table.
@@ -158,20 +184,55 @@ def createSql(fileName):
     # Write a CREATE statement for a spatial index for the table.
     sqlFile.write("CREATE INDEX x_spatial_index ON {} USING gist (thegeom); \n".format(TABLE_NAME))
 
+    # In insert mode add the extra columns first so they are filled as the rows are inserted.
+    insertColumns = []
+    if run.columnMode == 'insert':
+        insertColumns = wantedColumns(run)
+        if len(insertColumns) > 0:
+            sqlFile.write(addColumnsAlter(run, insertColumns))
+
     # Use iterator function to iterate through all points and append them to the file.
-    pointIterSql(generated_points, sqlFile, TABLE_NAME)
-    print("Successfully printed {} rows to {} with table name: {}.".format(NUMBER_ROWS, getSqlFile(fileName), TABLE_NAME))
+    pointIterSql(generated_points, sqlFile, TABLE_NAME, insertColumns)
+    print("Successfully printed {} rows to {} with table name: {}.".format(NUMBER_ROWS, run.sqlFile, TABLE_NAME))
 
     # Call the addColumnSql function which determines which columns are to be added to the SQL file. 
-    addColumnsSql(fileName, sqlFile)    
+    if run.columnMode == 'update':
+        addColumnsSql(run, sqlFile)    
+    # Or fill them all with one UPDATE from a bulk loaded staging table.
+    elif run.columnMode == 'staging':
+        fillColumnsStagingSql(run, sqlFile)
 
-# Config function takes in a .ini file and acquires the database connect information from it
-def config(fileName):
+# Reads the .ini file once, checks every section the target needs and returns the settings of the run.
+def loadRunConfig(fileName, target):
 
     # create a parser.
     parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+    # read config file, closing if it can't be read.
+    try:
+        found = parser.read(fileName)
+    except Exception:
+        print(".ini file could not be read.\nClosed.")
+        exit()
+    if len(found) == 0:
+        print(".ini file not found.\nClosed.")
+        exit()
+
+    # Only the database target needs [postgresql] and only the sql target needs [SQLFile].
+    database = config(parser) if target == 'database' else None
+    sqlFile = getSqlFile(parser) if target == 'sql' else None
+
+    return RunConfig(
+        fileName=fileName,
+        database=database,
+        numPoints=getNumPoints(parser),
+        geojsonName=getGeojsonName(parser),
+        tableName=getTableName(parser),
+        sqlFile=sqlFile,
+        addColumns=getAddColumns(parser),
+        columnMode=getColumnMode(parser))
+
+# Config function takes in the parsed .ini file and acquires the database connect information from it
+def config(parser):
 
     # Check parser for section of name 'postgresql'.
     db = {}     # Create empty list to store config information.
@@ -184,42 +245,38 @@ def config(fileName):
             # Move everything from params list to db list.
             
     else:
-        # If no 'postgresql' section found, skip.
-        raise Exception(
-            'Section {0} not found in the {1} file'.format(section, fileName))
+        # If no 'postgresql' section found, end program.
+        print("No [postgresql] in .ini file.\nClosed.")
+        exit()
     
     # Return the db list.
     return db
 
-# Takes in the name of the .ini file, finds the TableName section and finds the table name.
-def getTableName(fileName):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+# Takes in the parsed .ini file, finds the TableName section and finds the table name.
+def getTableName(parser):
 
     # Check parser for section of name 'TableName'.
     if parser.has_section('TableName'):
         nameOfTable = parser.items('TableName')
         # Store items in section 'TableName' in nameOfTable list of tuples.
+    else:
+        print("No [TableName] in .ini file.\nClosed.")
+        exit()
     TABLE_NAME = (nameOfTable[0][1])
 
     # Stores the name of the table.
     return TABLE_NAME
 
-# Takes in the name of the .ini file, finds the numPoints section and finds out how many points are wanted.
-def getNumPoints(fileName):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+# Takes in the parsed .ini file, finds the numPoints section and finds out how many points are wanted.
+def getNumPoints(parser):
 
     # Check parser for section of name 'numPoints'.
     if parser.has_section('numPoints'):
         pointsNum = parser.items('numPoints')
         # Store items in section 'numPoints' in pointsNum list of tuples.
+    else:
+        print("No [numPoints] in .ini file.\nClosed.")
+        exit()
     
     # Store value for number of points in NUMBER_ROWS.
     try:
@@ -236,23 +293,27 @@ def getNumPoints(fileName):
         print("numPoints must be a positive integer.")
         exit()    
 
-# Takes in the name of the .ini file and finds out which file has the geojson polygon.
-def getPolygon(fileName):
+# Takes in the parsed .ini file and finds out which file has the geojson polygon.
+def getGeojsonName(parser):
 
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+    # Check parser for section of name 'geojson'.
+    if parser.has_section('geojson'):
+        shapeBounds = parser.items('geojson')
+        # Store items in section 'geojson' in shapeBounds list of tuples.
+    else:
+        print("No [geojson] in .ini file.\nClosed.")
+        exit()
+    geojsonName = (shapeBounds[0][1])
+
+    # Stores the name of the geojson file.
+    return geojsonName
+
+# Takes in the settings of the run and loads the polygon from the geojson file.
+def getPolygon(run):
 
     try:
-        # Check parser for section of name 'geojson'.
-        if parser.has_section('geojson'):
-            shapeBounds = parser.items('geojson')
-            # Store items in section 'geojson' in shapeBounds list of tuples.
-        geojsonName = (shapeBounds[0][1])
-    
         # Load in GeoJSON file from .ini file as f and obtain "features" object.
-        with open(geojsonName) as f:
+        with open(run.geojsonName) as f:
             features = json.load(f)["features"]
         
         # Define shape as "geometry" from GeoJSON file and buffer(0) removes overlapping coordinates.
@@ -265,35 +326,40 @@ def getPolygon(fileName):
         exit()
     # Stores the name of the geojson file with the bounds of the polygon.
 
-# Takes in the name of the .ini file and finds out which file will be wrote to to create an SQL file.
-def getSqlFile(fileName):
+# Takes in the parsed .ini file and finds out which file will be wrote to to create an SQL file.
+def getSqlFile(parser):
 
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
     # Check parser for section of name 'geojson'.
     if parser.has_section('SQLFile'):
         sqlFile = parser.items('SQLFile')
         # Store items in section 'geojson' in shapeBounds list of tuples.
+    else:
+        print("No [SQLFile] in .ini file.\nClosed.")
+        exit()
     fileSql = (sqlFile[0][1])
     # Stores the name of the geojson file with the bounds of the polygon.
 
     return fileSql
 
-# Iterator takes in points to be commited, database cursor, database and the name of the table.
-def pointIterDb(generated_points, cur, con, TABLE_NAME):
+# Iterator takes in points to be commited, database cursor, database, the name of the table and the extra columns to fill as the rows are inserted.
+def pointIterDb(generated_points, cur, con, TABLE_NAME, insertColumns=()):
+
+    # Names of the extra columns to put in the INSERT statements.
+    names = "".join(name + "," for name in insertColumns)
+
     for aPoint in generated_points:
         # for each point in all points, create a random string of size 10.
-        random_string = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(10))
+        random_string = randomString()
+        # Create the values of the extra columns.
+        values = "".join(sqlLiteral(randomColumnValue(name)) + "," for name in insertColumns)
 
         # Set 'y' value to Latitude and 'x' value to Longitude.
         pointLatitude = aPoint.y
         pointLongitude = aPoint.x
 
-        # Make INSERT statement for the database using the table name, the random string and the latitude and longitude of the point.
-        queryStr = "INSERT into {} (txtField,theGeom) VALUES ('{}',ST_SetSRID(ST_MakePoint({},{}),4326)); \n".format(
-            TABLE_NAME, random_string, pointLongitude, pointLatitude)
+        # Make INSERT statement for the database using the table name, the random string, the extra columns and the latitude and longitude of the point.
+        queryStr = "INSERT into {} (txtField,{}theGeom) VALUES ('{}',{}ST_SetSRID(ST_MakePoint({},{}),4326)); \n".format(
+            TABLE_NAME, names, random_string, values, pointLongitude, pointLatitude)
 
         # Execute INSERT statement into database.
         cur.execute(queryStr)
@@ -301,19 +367,25 @@ def pointIterDb(generated_points, cur, con, TABLE_NAME):
         # Commit statement to database.
         con.commit()
 
-# Iterates through generated points and gives them a random string for the txtfield.
-def pointIterSql(generated_points, sqlFile, TABLE_NAME):
+# Iterates through generated points and gives them a random string for the txtfield and values for the extra columns to fill as the rows are inserted.
+def pointIterSql(generated_points, sqlFile, TABLE_NAME, insertColumns=()):
+
+    # Names of the extra columns to put in the INSERT statements.
+    names = "".join(name + "," for name in insertColumns)
+
     for aPoint in generated_points:
         # for each point in all points, create a random string of size 10.
-        random_string = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(10))
+        random_string = randomString()
+        # Create the values of the extra columns.
+        values = "".join(sqlLiteral(randomColumnValue(name)) + "," for name in insertColumns)
         
         # Set 'y' value to Latitude and 'x' value to Longitude.
         pointLatitude = aPoint.y
         pointLongitude = aPoint.x
 
-        # Make INSERT statement for the database using the table name, the random string and the latitude and longitude of the point.
-        queryStr = "INSERT into {} (txtField,theGeom) VALUES ('{}',ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
-                TABLE_NAME, random_string, pointLongitude, pointLatitude)
+        # Make INSERT statement for the database using the table name, the random string, the extra columns and the latitude and longitude of the point.
+        queryStr = "INSERT into {} (txtField,{}theGeom) VALUES ('{}',{}ST_SetSRID(ST_MakePoint({},{}),4326)); \r".format(
+                TABLE_NAME, names, random_string, values, pointLongitude, pointLatitude)
         # Write query string to SQL file.
         sqlFile.write(queryStr)
 
@@ -338,62 +410,185 @@ def random_points_within(poly, num_points):
 
     return points
 
-# Takes in the name of the .ini file and finds out which columns are to be added.
-def addColumnsSql(fileName, sqlFile):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
+# Takes in the parsed .ini file and finds out which columns are to be added.
+def getAddColumns(parser):
 
     # Search for section 'addColumn' in .ini file.
     if parser.has_section('addColumn'):
         # Store elements of 'addColumn' in columns.
         columns = parser.items('addColumn')
-        
+    else:
+        print("No [addColumn] in .ini file.\nClosed.")
+        exit()
+
+    # Only randStr, randInt, randTime and mode can be in [addColumn], the parser makes the keys lowercase.
+    for key, value in columns:
+        if key not in ('randstr', 'randint', 'randtime', 'mode'):
+            print("{} in [addColumn] isn't one of: randStr, randInt, randTime, mode.\nClosed.".format(key))
+            exit()
+
+    # Store whether each column is wanted in a dictionary, reading each by name so the keys can be in any order.
+    addColumns = {}
+    for name in ('randStr', 'randInt', 'randTime'):
+        value = parser.get('addColumn', name, fallback=None)
+        if value not in ("yes", "no"):
+            print("randStr, randInt and randTime in [addColumn] must be yes or no.\nClosed.")
+            exit()
+        addColumns[name] = value == "yes"
+    return addColumns
+
+# Takes in the parsed .ini file and finds out how the extra columns are filled.
+def getColumnMode(parser):
+
+    # 'update' adds each column afterwards and fills it with one UPDATE per row.
+    # 'insert' adds the columns first and fills them in the INSERT statements of the rows.
+    # 'staging' bulk loads the values into a staging table and fills every column with one UPDATE ... FROM.
+    columnMode = parser.get('addColumn', 'mode', fallback='update')
+    if columnMode not in ('update', 'insert', 'staging'):
+        print("mode in [addColumn] must be one of: update, insert, staging.\nClosed.")
+        exit()
+    return columnMode
+
+# Returns the names of the extra columns wanted in the run.
+def wantedColumns(run):
+
+    return [name for name in ('randStr', 'randInt', 'randTime') if run.addColumns[name]]
+
+# Returns one ALTER statement adding all of the given columns to the table.
+def addColumnsAlter(run, names):
+
+    return "ALTER TABLE {} {};\r".format(run.tableName, ", ".join("ADD {} {}".format(name, COLUMN_TYPES[name]) for name in names))
+
+# Generates a random string of size 10.
+def randomString():
+
+    return ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(10))
+
+# Generates a random timestamp in 2020 as YYYY-MM-DD HH:MM:SS.
+def randomTimestamp():
+
+    # Take a random number, translate that to seconds and develops that into HH:MM:SS format.
+    random_timestamp = datetime.timedelta(seconds=randrange(86400))
+
+    # Set a range for the random dates.
+    start_date = datetime.date(2020, 1, 1)
+    end_date = datetime.date(2020, 12, 31)
+    # Calculate range.
+    time_between_dates = end_date - start_date
+    # Reformat into days.
+    days_between_dates = time_between_dates.days
+    # Randomise the days.
+    random_number_of_days = random.randrange(days_between_dates)
+    # Format into YY:MM:DD.
+    random_date = start_date + datetime.timedelta(days=random_number_of_days)
+
+    return "{} {}".format(random_date, random_timestamp)
+
+# Generates a random value for one of the extra columns.
+def randomColumnValue(name):
+
+    if name == 'randStr':
+        return randomString()
+    elif name == 'randInt':
+        # Generates random integer between 0 and 1000.
+        return randint(0, 1000)
+    else:
+        return randomTimestamp()
+
+# Returns a value written as an SQL literal.
+def sqlLiteral(value):
+
+    if isinstance(value, str):
+        return "'{}'".format(value)
+    return str(value)
+
+# Bulk loads the extra columns into a staging table and fills them all into the table with one UPDATE ... FROM.
+def fillColumnsStagingDb(run, cur, con):
+
+    names = wantedColumns(run)
+    if len(names) == 0:
+        return
+    tableName = run.tableName
+    stagingName = "{}_staging".format(tableName)
+
+    # Create the staging table and load every row's values into it in multi-row INSERT statements of 1000 rows.
+    cur.execute("CREATE TEMP TABLE {} (pkid INT PRIMARY KEY, {});\r".format(stagingName, ", ".join("{} {}".format(name, COLUMN_TYPES[name]) for name in names)))
+    for start in range(0, run.numPoints, 1000):
+        # Only one page of rows is held in memory at a time.
+        rows = [tuple([x+1] + [randomColumnValue(name) for name in names]) for x in range(start, min(start + 1000, run.numPoints))]
+        psycopg2.extras.execute_values(cur, "INSERT INTO {} (pkid, {}) VALUES %s".format(stagingName, ", ".join(names)), rows, page_size=1000)
+
+    # Add the columns and fill them by joining on the pkid, rewriting every row once.
+    cur.execute(addColumnsAlter(run, names))
+    cur.execute(stagingUpdate(tableName, stagingName, names))
+    cur.execute("DROP TABLE {};\r".format(stagingName))
+    # Commit changes to database.
+    con.commit()
+    print("Successfully committed {} rows of {} into table: {}".format(run.numPoints, ", ".join(names), tableName))
+
+# Writes the staging table, its rows and the UPDATE ... FROM that fills the extra columns to the SQL file.
+def fillColumnsStagingSql(run, sqlFile):
+
+    names = wantedColumns(run)
+    if len(names) == 0:
+        return
+    tableName = run.tableName
+    stagingName = "{}_staging".format(tableName)
+
+    # Write the staging table and its rows in INSERT statements of 1000 rows.
+    sqlFile.write("CREATE TEMP TABLE {} (pkid INT PRIMARY KEY, {});\r".format(stagingName, ", ".join("{} {}".format(name, COLUMN_TYPES[name]) for name in names)))
+    for start in range(0, run.numPoints, 1000):
+        rows = ["({},{})".format(x+1, ",".join(sqlLiteral(randomColumnValue(name)) for name in names)) for x in range(start, min(start + 1000, run.numPoints))]
+        sqlFile.write("INSERT INTO {} (pkid, {}) VALUES {};\r".format(stagingName, ", ".join(names), ",".join(rows)))
+
+    # Write the ALTER and the UPDATE ... FROM that fills every column in one pass.
+    sqlFile.write(addColumnsAlter(run, names))
+    sqlFile.write(stagingUpdate(tableName, stagingName, names))
+    sqlFile.write("DROP TABLE {};\r".format(stagingName))
+    print("Successfully added {} rows of {} into {} for table: {}".format(run.numPoints, ", ".join(names), run.sqlFile, tableName))
+
+# Returns the UPDATE ... FROM statement that copies the columns from the staging table by pkid.
+def stagingUpdate(tableName, stagingName, names):
+
+    return "UPDATE {} SET {} FROM {} WHERE {}.pkid = {}.pkid;\r".format(
+        tableName, ", ".join("{} = {}.{}".format(name, stagingName, name) for name in names), stagingName, tableName, stagingName)
+
+# Takes in the settings of the run and the SQL file and adds the wanted columns.
+def addColumnsSql(run, sqlFile):
+
     # If randStr=yes then call addColumnStrSql.
-    if columns[0][1] == "yes":
-        addColumnStrSql(fileName, sqlFile)
+    if run.addColumns['randStr']:
+        addColumnStrSql(run, sqlFile)
 
     # If randInt=yes then call addColumnIntSql.
-    if columns[1][1] == "yes":
-        addColumnIntSql(fileName, sqlFile)
+    if run.addColumns['randInt']:
+        addColumnIntSql(run, sqlFile)
 
     # If randTime=yes then call addColumnTimeSql.
-    if columns[2][1] == "yes":
-        addColumnTimeSql(fileName, sqlFile)
+    if run.addColumns['randTime']:
+        addColumnTimeSql(run, sqlFile)
 
-# Takes in the name of the .ini file, the database sursor and the active database connection then finds out which columns are to be added.
-def addColumnsDb(fileName, cur, con):
-
-    # create a parser.
-    parser = ConfigParser()
-    # read config file.
-    parser.read(fileName)
-
-    # Search for section 'addColumn' in .ini file.
-    if parser.has_section('addColumn'):
-        # Store elements of 'addColumn' in columns.
-        columns = parser.items('addColumn')
+# Takes in the settings of the run, the database sursor and the active database connection then adds the wanted columns.
+def addColumnsDb(run, cur, con):
 
     # If randStr=yes then call addColumnStrDb.
-    if columns[0][1] == "yes":
-        addColumnStrDb(fileName, cur, con)
+    if run.addColumns['randStr']:
+        addColumnStrDb(run, cur, con)
 
     # If randInt=yes then call addColumnIntDb.
-    if columns[1][1] == "yes":
-        addColumnIntDb(fileName, cur, con)
+    if run.addColumns['randInt']:
+        addColumnIntDb(run, cur, con)
 
     # If randTime=yes then call addColumnTimeDb.
-    if columns[2][1] == "yes":
-        addColumnTimeDb(fileName, cur, con)
+    if run.addColumns['randTime']:
+        addColumnTimeDb(run, cur, con)
 
-# Takes in the .ini fileName and sql file name and updates the SQL file with random strings.
-def addColumnStrSql(fileName, sqlFile):
+# Takes in the settings of the run and sql file and updates the SQL file with random strings.
+def addColumnStrSql(run, sqlFile):
 
     # Acquire the name of the table and the number of rows in it.
-    tableName = getTableName(fileName)
-    numPoints = getNumPoints(fileName)
+    tableName = run.tableName
+    numPoints = run.numPoints
 
     # Write ALTER statement used to add new column to table.
     sqlFile.write("ALTER TABLE {} ADD randStr VARCHAR(50);\r".format(tableName))
@@ -401,20 +596,20 @@ def addColumnStrSql(fileName, sqlFile):
     # Iterate through the rows adding in a random string.
     for x in range(numPoints):
         # Generates random string.
-        random_string = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(10))
+        random_string = randomString()
         # Generate query string using the table, the generated string and the pkid.
         queryStr = "UPDATE {} SET randStr = '{}' WHERE pkid = {}; \r".format(tableName, random_string, x+1)
         # Append query to SQL file.
         sqlFile.write(queryStr)
 
-    print("Successfully added {} random strings into {} for column randStr in table: {}".format(numPoints, getSqlFile(fileName), tableName))
+    print("Successfully added {} random strings into {} for column randStr in table: {}".format(numPoints, run.sqlFile, tableName))
 
-# Takes in the .ini fileName and sql file name and updates the SQL file with random integers.
-def addColumnIntSql(fileName, sqlFile):
+# Takes in the settings of the run and sql file and updates the SQL file with random integers.
+def addColumnIntSql(run, sqlFile):
 
     # Acquire the name of the table and the number of rows in it.
-    tableName = getTableName(fileName)
-    numPoints = getNumPoints(fileName)
+    tableName = run.tableName
+    numPoints = run.numPoints
     
     # Write ALTER statement used to add new column to table.
     sqlFile.write("ALTER TABLE {} ADD randInt INT;\r".format(tableName))
@@ -428,48 +623,36 @@ def addColumnIntSql(fileName, sqlFile):
         # Append query to SQL file.
         sqlFile.write(queryStr)
 
-    print("Successfully added {} random integers into {} for column randInt in table: {}".format(numPoints, getSqlFile(fileName), tableName))
+    print("Successfully added {} random integers into {} for column randInt in table: {}".format(numPoints, run.sqlFile, tableName))
 
-# Takes in the .ini fileName and sql file name and updates the SQL file with random timestamps.
-def addColumnTimeSql(fileName, sqlFile):
+# Takes in the settings of the run and sql file and updates the SQL file with random timestamps.
+def addColumnTimeSql(run, sqlFile):
         
     # Acquire the name of the table and the number of rows in it.
-    tableName = getTableName(fileName)
-    numPoints = getNumPoints(fileName)
+    tableName = run.tableName
+    numPoints = run.numPoints
 
     # Write ALTER statement used to add new column to table.
     sqlFile.write("ALTER TABLE {} ADD randTime TIMESTAMP;\r".format(tableName))
 
     # Iterate through the rows adding in a random integer.
     for x in range(numPoints):
-        # Take a random number, translate that to seconds and develops that into HH:MM:SS format.
-        random_timestamp = datetime.timedelta(seconds=randrange(86400))
-
-        # Set a range for the random dates.
-        start_date = datetime.date(2020, 1, 1)
-        end_date = datetime.date(2020, 12, 31)
-        # Calculate range.
-        time_between_dates = end_date - start_date
-        # Reformat into days.
-        days_between_dates = time_between_dates.days
-        # Randomise the days.
-        random_number_of_days = random.randrange(days_between_dates)
-        # Format into YY:MM:DD.
-        random_date = start_date + datetime.timedelta(days=random_number_of_days)
+        # Generates random timestamp in 2020.
+        random_time = randomTimestamp()
 
         # Generate query string using the table, the generated timestamp and the pkid.
-        queryStr = "UPDATE {} SET randTime = '{} {}' WHERE pkid = {}; \r".format(tableName, random_date, random_timestamp, x+1)
+        queryStr = "UPDATE {} SET randTime = '{}' WHERE pkid = {}; \r".format(tableName, random_time, x+1)
         # Append query to SQL file.
         sqlFile.write(queryStr)
 
-    print("Successfully added {} random timestamps into {} for column randTime in table: {}".format(numPoints, getSqlFile(fileName), tableName))
+    print("Successfully added {} random timestamps into {} for column randTime in table: {}".format(numPoints, run.sqlFile, tableName))
 
-# Takes in the .ini fileName and sql file name and updates the SQL file with random strings.
-def addColumnStrDb(fileName, cur, con):
+# Takes in the settings of the run and sql file and updates the SQL file with random strings.
+def addColumnStrDb(run, cur, con):
 
     # Acquire the name of the table and the number of rows in it.
-    tableName = getTableName(fileName)
-    numPoints = getNumPoints(fileName)
+    tableName = run.tableName
+    numPoints = run.numPoints
 
     # Execute ALTER statement used to add new column to table in database.
     cur.execute("ALTER TABLE {} ADD randStr VARCHAR(50);\r".format(tableName))
@@ -479,7 +662,7 @@ def addColumnStrDb(fileName, cur, con):
     # Iterate through the rows adding in a random string.
     for x in range(numPoints):
         # Generate random string in range(10).
-        random_string = ''.join(random.SystemRandom().choice(string.ascii_letters + string.digits) for _ in range(10))
+        random_string = randomString()
         # Create query to be committed.
         queryStr = "UPDATE {} SET randStr = '{}' WHERE pkid = {}; \r".format(tableName, random_string, x+1)
         # Execute query to table.
@@ -488,12 +671,12 @@ def addColumnStrDb(fileName, cur, con):
         con.commit()
     print("Successfully committed {} random strings into new column randStr in table: {}".format(numPoints, tableName))
 
-# Takes in the .ini fileName and sql file name and updates the SQL file with random integers.
-def addColumnIntDb(fileName, cur, con):
+# Takes in the settings of the run and sql file and updates the SQL file with random integers.
+def addColumnIntDb(run, cur, con):
 
     # Acquire the name of the table and the number of rows in it.
-    tableName = getTableName(fileName)
-    numPoints = getNumPoints(fileName)
+    tableName = run.tableName
+    numPoints = run.numPoints
     
     # Execute ALTER statement used to add new column to table in database.
     cur.execute("ALTER TABLE {} ADD randInt INT;\r".format(tableName))
@@ -512,12 +695,12 @@ def addColumnIntDb(fileName, cur, con):
         con.commit()
     print("Successfully committed {} random integers into new column randInt in table: {}".format(numPoints, tableName))
 
-# Takes in the .ini fileName and sql file name and updates the SQL file with random timestamps.
-def addColumnTimeDb(fileName, cur, con):
+# Takes in the settings of the run and sql file and updates the SQL file with random timestamps.
+def addColumnTimeDb(run, cur, con):
 
     # Acquire the name of the table and the number of rows in it.
-    tableName = getTableName(fileName)
-    numPoints = getNumPoints(fileName)
+    tableName = run.tableName
+    numPoints = run.numPoints
 
     # Execute ALTER statement used to add new column to table in database.
     cur.execute("ALTER TABLE {} ADD randTime TIMESTAMP;\r".format(tableName))
@@ -526,24 +709,11 @@ def addColumnTimeDb(fileName, cur, con):
 
     # Iterate through the rows adding in a random string.
     for x in range(numPoints):
-        # Take a random number, translate that to seconds and develops that into HH:MM:SS format.
-        random_timestamp = datetime.timedelta(seconds=randrange(86400))
-
-        # Set a range for the random dates.
-        start_date = datetime.date(2020, 1, 1)
-        end_date = datetime.date(2020, 12, 31)
-        
-        # Calculate range.
-        time_between_dates = end_date - start_date
-        # Reformat into days.
-        days_between_dates = time_between_dates.days
-        # Randomise the days.
-        random_number_of_days = random.randrange(days_between_dates)
-        # Format into YY:MM:DD.
-        random_date = start_date + datetime.timedelta(days=random_number_of_days)
+        # Generates random timestamp in 2020.
+        random_time = randomTimestamp()
 
         # Generate query string using the table, the generated timestamp and the pkid.
-        queryStr = "UPDATE {} SET randTime = '{} {}' WHERE pkid = {}; \r".format(tableName, random_date, random_timestamp, x+1)
+        queryStr = "UPDATE {} SET randTime = '{}' WHERE pkid = {}; \r".format(tableName, random_time, x+1)
         # Execute query to table.
         cur.execute(queryStr)
         # Commit changes to database.